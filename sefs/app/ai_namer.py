@@ -1,13 +1,88 @@
 import google.generativeai as genai
 from .config import Config
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import numpy as np
+import random
 import re
+import threading
+import time
+
+# Strips the ```json ... ``` fences Gemini likes to wrap JSON replies in
+_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$', re.IGNORECASE)
+# Server-suggested wait in Gemini 429 messages ("Please retry in 37.5s", "retry_delay { seconds: 37 }")
+_RETRY_IN_RE = re.compile(r'retry in (\d+(?:\.\d+)?)\s*s', re.IGNORECASE)
+_RETRY_DELAY_RE = re.compile(r'retry_delay\s*\{\s*seconds:\s*(\d+)')
+# Folder-name sanitizing: one translate pass for separators, one regex pass for the rest
+_NAME_TRANS = str.maketrans({' ': '_', '-': '_', '\n': '_', '\r': ''})
+_NAME_DISALLOWED_RE = re.compile(r'[^A-Za-z0-9_]+')
+# Already-canonical reply (Word_Word, each part capitalized) - the common case
+_CANONICAL_NAME_RE = re.compile(r'[A-Z0-9][a-z0-9]*(?:_[A-Z0-9][a-z0-9]*)*')
+
+
+def _samples_key(samples):
+    """
+    Stable cross-process cache key: samples streamed into one digest, 0x1F-separated.
+    Sorted first, so the same members ranked in a different order still hit the cache.
+    Always SHA-256: the keys are persisted, so they can't depend on optional packages.
+    """
+    h = hashlib.sha256()
+    for sample in sorted(samples):
+        h.update(sample.encode('utf-8'))
+        h.update(b'\x1f')
+    return h.hexdigest()
+
+
+class TokenBucket:
+    """
+    Client-side rate limiter: allows `burst` requests at once, refilling at `rate_per_sec`.
+    Keeps us under the Gemini RPM quota instead of reacting to 429s after the fact.
+    """
+    def __init__(self, rate_per_sec, burst):
+        self.rate = rate_per_sec
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Takes one token and returns how many seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
 
 class AINamer:
     """
     Uses Google Gemini to generate descriptive folder names based on file content.
+    Names are cached in memory and, when a DatabaseManager is given, in SQLite.
     """
-    def __init__(self):
+    def __init__(self, db=None):
         self.cache = {}
+        self.db = db
+        # Single-flight: one API call per cache key, concurrent callers wait on it
+        self._lock = threading.Lock()
+        self._inflight = {}  # {cache_key: concurrent.futures.Future}
+        # One long-lived loop for the async fallback: the model's grpc.aio client binds
+        # to the first loop that uses it, so a fresh asyncio.run() per pass would break it
+        self._loop = None
+        self._bucket = TokenBucket(Config.GEMINI_RPM / 60.0, Config.AI_NAMER_CONCURRENCY)
+        # Semantic cache: L2-normalized cluster centroids (K, D) and their names
+        self._centroid_names = []
+        self._centroid_matrix = None
+        self._load_centroids()
         self.enabled = Config.USE_AI_NAMING and Config.GEMINI_API_KEY
         
         if self.enabled:
@@ -29,54 +104,432 @@ class AINamer:
             elif not Config.GEMINI_API_KEY:
                 print("AI Naming Service: Disabled (no API key)")
 
-    def generate_folder_name(self, text_samples, cluster_id):
+    def generate_folder_name(self, text_samples, cluster_id, centroid=None):
         """
         Generates a descriptive folder name based on content.
         
         Args:
             text_samples: List of text strings (NOT file paths!)
             cluster_id: Fallback ID
+            centroid: Optional mean embedding of the cluster, for the semantic cache
             
         Returns:
             Descriptive folder name
         """
+        name, cache_key, valid_samples = self._lookup_name(text_samples, cluster_id, centroid)
+        if name:
+            return name
+
+        with self._lock:
+            # Re-check: another thread may have finished while we were looking up
+            name = self.cache.get(cache_key)
+            future = self._inflight.get(cache_key)
+            owner = name is None and future is None
+            if owner:
+                future = concurrent.futures.Future()
+                self._inflight[cache_key] = future
+        if name:
+            return name
+        if not owner:
+            print(f"  [AI] Waiting on in-flight request for cluster {cluster_id}...")
+            return future.result() or f"Semantic_Cluster_{cluster_id}"
+
+        try:
+            print(f"  [AI] Analyzing cluster {cluster_id}...")
+            text = self._call_model(self._build_prompt(valid_samples), first_line=True)
+            name = self._finish_name(text, cache_key, cluster_id, centroid)
+            # Waiters get the validated name only, never our cluster's fallback
+            future.set_result(self.cache.get(cache_key))
+            return name
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(cache_key, None)
+
+    async def generate_folder_name_async(self, text_samples, cluster_id, centroid=None, taken=None,
+                                         sem=None, inflight=None):
+        """
+        Async variant of generate_folder_name. taken: optional set of names already given
+        out in this pass. sem / inflight: the concurrency semaphore and single-flight map
+        ({cache_key: [Future, waiter count]}) of the current event loop, shared by
+        generate_many across its calls; created fresh when omitted.
+        """
+        name, cache_key, valid_samples = self._lookup_name(text_samples, cluster_id, centroid, taken)
+        if name:
+            return name
+
+        if sem is None:
+            sem = asyncio.Semaphore(Config.AI_NAMER_CONCURRENCY)
+        if inflight is None:
+            inflight = {}
+        entry = inflight.get(cache_key)
+        if entry is not None:
+            print(f"  [AI] Waiting on in-flight request for cluster {cluster_id}...")
+            entry[1] += 1
+            return await entry[0] or f"Semantic_Cluster_{cluster_id}"
+        future = asyncio.get_running_loop().create_future()
+        entry = inflight[cache_key] = [future, 0]
+
+        try:
+            async with sem:
+                print(f"  [AI] Analyzing cluster {cluster_id}...")
+                text = await self._call_model_async(self._build_prompt(valid_samples), first_line=True)
+            name = self._finish_name(text, cache_key, cluster_id, centroid)
+            future.set_result(self.cache.get(cache_key))
+            return name
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if entry[1]:
+                future.set_exception(e)
+            else:
+                future.cancel()  # nobody to retrieve the exception
+            raise
+        finally:
+            inflight.pop(cache_key, None)
+
+    async def generate_many(self, clusters, centroids=None, taken=None):
+        """
+        Names many clusters concurrently, one request per cluster.
+        
+        Args:
+            clusters: Dict of {cluster_id: list of text samples}
+            centroids: Optional dict of {cluster_id: mean embedding}
+            taken: Optional set of names other clusters of this pass already got
+            
+        Returns:
+            Dict of {cluster_id: descriptive folder name}
+        """
+        centroids = centroids or {}
+        # Per call, not on self, so overlapping runs don't share them
+        sem = asyncio.Semaphore(Config.AI_NAMER_CONCURRENCY)
+        inflight = {}  # {cache_key: [asyncio.Future, waiter count]}
+        taken = set(taken or ())
+        cluster_ids = list(clusters)
+        names = await asyncio.gather(*[
+            self.generate_folder_name_async(clusters[cluster_id], cluster_id, centroids.get(cluster_id), taken,
+                                            sem, inflight)
+            for cluster_id in cluster_ids
+        ])
+        return dict(zip(cluster_ids, names))
+
+    def generate_folder_names(self, clusters, centroids=None):
+        """
+        Generates folder names for many clusters with a single Gemini request.
+        
+        Args:
+            clusters: Dict of {cluster_id: list of text samples}
+            centroids: Optional dict of {cluster_id: mean embedding}, for the semantic cache
+            
+        Returns:
+            Dict of {cluster_id: descriptive folder name}
+        """
+        centroids = centroids or {}
+        names = {}
+        pending = {}  # {cluster_id: (cache_key, valid_samples)}
+        taken = set()  # names given out in this pass: each cluster needs its own folder
+        
+        for cluster_id, text_samples in clusters.items():
+            # Cache-key each cluster on its own so only misses go to the API
+            name, cache_key, valid_samples = self._lookup_name(text_samples, cluster_id)
+            if name:
+                names[cluster_id] = name
+                taken.add(name)
+            else:
+                pending[cluster_id] = (cache_key, valid_samples)
+        
+        # Semantic cache after all exact hits, so it can't hand out a name one of them claimed
+        for cluster_id in list(pending):
+            centroid = centroids.get(cluster_id)
+            name = self._semantic_lookup(centroid, taken) if centroid is not None else None
+            if name:
+                names[cluster_id] = name
+                taken.add(name)
+                del pending[cluster_id]
+        
+        if not pending:
+            return names
+        
+        batch_names = self._request_batch_names(pending)
+        
+        missing = {}
+        for cluster_id, (cache_key, valid_samples) in pending.items():
+            name = batch_names.get(cluster_id)
+            if name:
+                self.put_name(cache_key, name, centroids.get(cluster_id))
+                names[cluster_id] = name
+                taken.add(name)
+            else:
+                missing[cluster_id] = valid_samples
+        
+        if missing:
+            # Batch reply skipped these clusters - ask for them individually, concurrently
+            coro = self.generate_many(missing, centroids, taken)
+            names.update(asyncio.run_coroutine_threadsafe(coro, self._event_loop()).result())
+        
+        return names
+
+    def _event_loop(self):
+        """The namer's background event loop, started on first use"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="AINamerLoop", daemon=True).start()
+            return self._loop
+
+    def _request_batch_names(self, pending):
+        """Sends one prompt for all pending clusters, returns {cluster_id: name}"""
+        blocks = []
+        ids_by_key = {}
+        for cluster_id, (_, valid_samples) in pending.items():
+            combined_text = "\n---\n".join(valid_samples)
+            blocks.append(f"Group {cluster_id}:\n{combined_text[:1500]}")
+            ids_by_key[str(cluster_id)] = cluster_id
+        groups_text = "\n\n".join(blocks)
+        
+        prompt = f"""Suggest ONE concise folder name (2-3 words max) for EACH numbered group of document excerpts.
+
+{groups_text}
+
+Rules:
+- Format: Word_Word (Underscore case)
+- Descriptive and specific
+- Max 3 words, NO extensions, NO special chars except _
+- Return a JSON object mapping group number to folder name, e.g. {{"0": "Financial_Invoices"}}
+- Respond with ONLY the JSON object.
+
+JSON:"""
+
+        print(f"  [AI] Naming {len(pending)} clusters in one request...")
+        text = self._call_model(prompt)
+        if not text:
+            return {}
+        
+        try:
+            parsed = json.loads(_FENCE_RE.sub('', text.strip()))
+        except ValueError as e:
+            print(f"  [AI] Could not parse batch reply as JSON: {e}")
+            return {}
+        if not isinstance(parsed, dict):
+            print(f"  [AI] Batch reply is not a JSON object")
+            return {}
+        
+        names = {}
+        for key, raw_name in parsed.items():
+            cluster_id = ids_by_key.get(str(key).strip())
+            if cluster_id is None or not isinstance(raw_name, str):
+                continue
+            name = self._sanitize_name(raw_name)
+            if self._is_valid_name(name):
+                names[cluster_id] = name
+                print(f"  ✓ AI Named cluster {cluster_id}: '{name}'")
+        return names
+
+    def _call_model(self, prompt, first_line=False):
+        """
+        Sends prompt to Gemini with retry on rate limits. Returns reply text or None.
+        With first_line=True the reply is streamed and cut off after its first line.
+        """
+        max_retries = 3
+        
+        for attempt in range(max_retries):
+            try:
+                self._bucket.acquire()
+                print(f"  [AI] Requesting from {Config.GEMINI_MODEL} (Attempt {attempt+1}/{max_retries})...")
+                if first_line:
+                    text = self._stream_first_line(self.model.generate_content(prompt, stream=True))
+                else:
+                    response = self.model.generate_content(prompt)
+                    text = response.text if response else None
+                
+                if not text:
+                    print(f"  [AI] Empty response from API")
+                    return None
+                return text
+                    
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    print(f"  ✗ AI Naming Error: {type(e).__name__}: {e}")
+                    break
+                print(f"  [AI] Rate limit hit. Waiting {delay:.1f}s... (Attempt {attempt+1})")
+                time.sleep(delay)
+        
+        return None
+
+    async def _call_model_async(self, prompt, first_line=False):
+        """Async variant of _call_model using generate_content_async"""
+        max_retries = 3
+        
+        for attempt in range(max_retries):
+            try:
+                await asyncio.sleep(self._bucket.reserve())
+                print(f"  [AI] Requesting from {Config.GEMINI_MODEL} (Attempt {attempt+1}/{max_retries})...")
+                if first_line:
+                    stream = await self.model.generate_content_async(prompt, stream=True)
+                    text = await self._stream_first_line_async(stream)
+                else:
+                    response = await self.model.generate_content_async(prompt)
+                    text = response.text if response else None
+                
+                if not text:
+                    print(f"  [AI] Empty response from API")
+                    return None
+                return text
+                    
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    print(f"  ✗ AI Naming Error: {type(e).__name__}: {e}")
+                    break
+                print(f"  [AI] Rate limit hit. Waiting {delay:.1f}s... (Attempt {attempt+1})")
+                await asyncio.sleep(delay)
+        
+        return None
+
+    def _stream_first_line(self, stream):
+        """Reads streamed chunks until the first non-empty line is complete"""
+        buf = ""
+        for chunk in stream:
+            buf += chunk.text
+            if '\n' in buf.lstrip():
+                break  # The name is one line; don't wait for the rest of the decode
+        return self._first_line(buf)
+
+    async def _stream_first_line_async(self, stream):
+        buf = ""
+        async for chunk in stream:
+            buf += chunk.text
+            if '\n' in buf.lstrip():
+                break
+        return self._first_line(buf)
+
+    def _first_line(self, text):
+        for line in text.splitlines():
+            if line.strip():
+                return line
+        return None
+
+    def _retry_delay(self, error, attempt):
+        """
+        Seconds to wait before retrying after error, or None if it isn't a rate limit.
+        Honours a server-provided Retry-After, else uses full-jitter exponential backoff.
+        """
+        error_str = str(error)
+        if "429" not in error_str and "ResourceExhausted" not in error_str:
+            return None
+        
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None) or {}
+        retry_after = headers.get('Retry-After') if hasattr(headers, 'get') else None
+        if retry_after is None:
+            match = _RETRY_IN_RE.search(error_str) or _RETRY_DELAY_RE.search(error_str)
+            retry_after = match.group(1) if match else None
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        
+        base, cap = 5, 60  # seconds
+        return random.uniform(0, min(cap, base * 2 ** attempt))
+
+    def _lookup_name(self, text_samples, cluster_id, centroid=None, taken=None):
+        """
+        Resolves a name without calling the API where possible. A name found in the
+        cache is added to taken (if given); semantic hits on a taken name are skipped.
+        
+        Returns:
+            (name, cache_key, valid_samples) - name is None when an API call is needed
+        """
         if not self.enabled:
-            return f"Semantic_Cluster_{cluster_id}"
+            return f"Semantic_Cluster_{cluster_id}", None, []
         
         # Explicit handling for Noise/Unclassified cluster
         if cluster_id == -1:
-            return "Miscellaneous_Files"
-        if not text_samples or not isinstance(text_samples, list):
-            print(f"WARNING: Invalid text_samples for cluster {cluster_id}")
-            return f"Semantic_Cluster_{cluster_id}"
-        
-        # Filter out any file paths accidentally passed in
-        valid_samples = []
-        for sample in text_samples[:5]:
-            if isinstance(sample, str) and len(sample) > 10:
-                # Check if it looks like a file path (has backslash/forward slash)
-                if '\\' not in sample and '/' not in sample:
-                    valid_samples.append(sample[:500])
-                elif len(sample) > 100:  # If it's long, might be actual content
-                    valid_samples.append(sample[:500])
+            return "Miscellaneous_Files", None, []
         
+        valid_samples = self._filter_samples(text_samples, cluster_id)
         if not valid_samples:
             print(f"WARNING: No valid text samples for cluster {cluster_id}")
-            return f"Semantic_Cluster_{cluster_id}"
+            return f"Semantic_Cluster_{cluster_id}", None, []
         
-        # Create cache key
-        cache_key = hash(tuple(valid_samples))
+        # Stable across processes (unlike hash()), so it can key the on-disk cache
+        cache_key = _samples_key(valid_samples)
+        name = self.get_name(cache_key)
+        if not name and centroid is not None:
+            name = self._semantic_lookup(centroid, taken)
+        if name and taken is not None:
+            taken.add(name)
+        return name, cache_key, valid_samples
+
+    def get_name(self, cache_key):
+        """Looks up a cached name: memory first, then SQLite"""
         if cache_key in self.cache:
             return self.cache[cache_key]
+        if self.db is not None:
+            name = self.db.get_ai_name(cache_key, Config.AI_NAME_TTL_DAYS)
+            if name:
+                self.cache[cache_key] = name
+                return name
+        return None
+
+    def put_name(self, cache_key, name, centroid=None):
+        self.cache[cache_key] = name
+        if centroid is not None:
+            centroid = np.asarray(centroid, dtype=np.float32)
+            self._add_centroid(centroid, name)
+        if self.db is not None:
+            self.db.put_ai_name(cache_key, name, centroid.tobytes() if centroid is not None else None)
+
+    def _load_centroids(self):
+        """Seeds the semantic cache from centroids persisted in SQLite"""
+        if self.db is None:
+            return
+        for name, blob in self.db.get_ai_name_centroids(Config.AI_NAME_TTL_DAYS):
+            self._add_centroid(np.frombuffer(blob, dtype=np.float32), name)
+
+    def _add_centroid(self, centroid, name):
+        norm = np.linalg.norm(centroid)
+        if norm == 0:
+            return
+        row = (centroid / norm)[np.newaxis, :]
+        if self._centroid_matrix is None or self._centroid_matrix.shape[1] != row.shape[1]:
+            # First entry, or the embedding model changed dimension - start over
+            self._centroid_matrix = row
+            self._centroid_names = [name]
+        else:
+            self._centroid_matrix = np.vstack([self._centroid_matrix, row])
+            self._centroid_names.append(name)
+
+    def _semantic_lookup(self, centroid, taken=None):
+        """
+        Returns the name of the most cosine-similar cached centroid above threshold,
+        unless another cluster already has that name (sibling topics often exceed it)
+        """
+        if self._centroid_matrix is None:
+            return None
+        centroid = np.asarray(centroid, dtype=np.float32)
+        norm = np.linalg.norm(centroid)
+        if norm == 0 or centroid.shape[0] != self._centroid_matrix.shape[1]:
+            return None
         
-        max_retries = 3
-        retry_delay = 5  # Base delay in seconds
-        
-        for attempt in range(max_retries):
-            try:
-                print(f"  [AI] Analyzing cluster {cluster_id} (Attempt {attempt+1}/{max_retries})...")
-                combined_text = "\n\n---\n\n".join(valid_samples)
-                prompt = f"""Suggest ONE concise folder name (2-3 words max) for these document excerpts.
+        cos = self._centroid_matrix @ (centroid / norm)
+        best = int(np.argmax(cos))
+        if cos[best] >= Config.SEMANTIC_CACHE_THRESHOLD:
+            if taken is not None and self._centroid_names[best] in taken:
+                print(f"  [AI] Semantic cache hit '{self._centroid_names[best]}' is taken, asking the API")
+                return None
+            print(f"  [AI] Semantic cache hit (cos={cos[best]:.3f}): '{self._centroid_names[best]}'")
+            return self._centroid_names[best]
+        return None
+
+    def _build_prompt(self, valid_samples):
+        combined_text = "\n\n---\n\n".join(valid_samples)
+        return f"""Suggest ONE concise folder name (2-3 words max) for these document excerpts.
                 
 Docs:
 {combined_text[:1500]}
@@ -89,54 +542,52 @@ Rules:
 
 Name:"""
 
-                print(f"  [AI] Requesting name from {Config.GEMINI_MODEL}...")
-                response = self.model.generate_content(prompt)
-                
-                if not response or not response.text:
-                    print(f"  [AI] Empty response from API")
-                    return f"Semantic_Cluster_{cluster_id}"
-                    
-                name = response.text.strip()
-                print(f"  [AI] Gemini suggested: '{name}'")
-                
-                # Clean and validate
-                name = self._sanitize_name(name)
-                
-                if name and len(name) > 2 and len(name) < 60:
-                    self.cache[cache_key] = name
-                    print(f"  ✓ AI Named: '{name}'")
-                    return name
-                else:
-                    return f"Semantic_Cluster_{cluster_id}"
-                    
-            except Exception as e:
-                error_str = str(e)
-                if "429" in error_str or "ResourceExhausted" in error_str:
-                    print(f"  [AI] Rate limit hit. Waiting {retry_delay}s... (Attempt {attempt+1})")
-                    import time
-                    time.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
-                else:
-                    print(f"  ✗ AI Naming Error: {type(e).__name__}: {error_str}")
-                    break
-        
+    def _finish_name(self, text, cache_key, cluster_id, centroid=None):
+        """Sanitizes and caches a model reply, falling back to the cluster ID"""
+        if not text:
+            return f"Semantic_Cluster_{cluster_id}"
+
+        name = text.strip()
+        print(f"  [AI] Gemini suggested: '{name}'")
+
+        # Clean and validate
+        name = self._sanitize_name(name)
+
+        if self._is_valid_name(name):
+            self.put_name(cache_key, name, centroid)
+            print(f"  ✓ AI Named: '{name}'")
+            return name
         return f"Semantic_Cluster_{cluster_id}"
+
+    def _filter_samples(self, text_samples, cluster_id):
+        """Keeps up to 5 content samples, dropping anything that looks like a file path"""
+        if not text_samples or not isinstance(text_samples, list):
+            print(f"WARNING: Invalid text_samples for cluster {cluster_id}")
+            return []
+        
+        valid_samples = []
+        for sample in text_samples[:5]:
+            if isinstance(sample, str) and len(sample) > 10:
+                # Check if it looks like a file path (has backslash/forward slash)
+                if '\\' not in sample and '/' not in sample:
+                    valid_samples.append(sample[:500])
+                elif len(sample) > 100:  # If it's long, might be actual content
+                    valid_samples.append(sample[:500])
+        return valid_samples
+
+    def _is_valid_name(self, name):
+        return bool(name) and 2 < len(name) < 60
     
     def _sanitize_name(self, name):
         """Clean up AI-generated name"""
-        # Remove quotes, extra spaces, newlines
-        name = name.strip().strip('"').strip("'").strip('`')
-        name = name.replace('\n', ' ').replace('\r', '')
-        
-        # Take only first line if multiple
-        if '\n' in name:
-            name = name.split('\n')[0]
-        
-        # Convert spaces/hyphens to underscores
-        name = name.replace(' ', '_').replace('-', '_')
+        name = name.strip().strip('"\'`')
+        # Fast path: well-formed replies come back exactly as they'd be rewritten
+        if len(name) <= 50 and _CANONICAL_NAME_RE.fullmatch(name):
+            return name
         
-        # Remove any characters that aren't alphanumeric or underscore
-        name = re.sub(r'[^a-zA-Z0-9_]', '', name)
+        # Remove quotes/whitespace, fold spaces/hyphens/newlines to underscores and
+        # drop anything that isn't alphanumeric or underscore
+        name = _NAME_DISALLOWED_RE.sub('', name.strip().strip('"\'`').translate(_NAME_TRANS))
         
         # Capitalize each word
         parts = [p for p in name.split('_') if p]
@@ -3,23 +3,78 @@ import hdbscan
 from sklearn.decomposition import PCA
 from sklearn.metrics import silhouette_score, davies_bouldin_score
 import numpy as np
+import os
+import pickle
+import multiprocessing as mp
+from multiprocessing import shared_memory
 from .config import Config
 
+try:
+    import faiss  # Optional: HNSW neighbor search for large corpora
+except ImportError:
+    faiss = None
+
+try:
+    # Optional: RAPIDS cuML GPU versions of UMAP and HDBSCAN for large corpora
+    from cuml.manifold import UMAP as cuUMAP
+    from cuml.cluster import HDBSCAN as cuHDBSCAN
+    from cuml.cluster.hdbscan import approximate_predict as cu_approximate_predict
+except ImportError:
+    cuUMAP = None
+
+
+_INLINE_BYTES = 1 << 20  # arrays smaller than this are pickled over the pipe, not shared
+
+
+def _l2_normalize(X):
+    """Unit-length rows: euclidean distance then ranks neighbors exactly like cosine"""
+    return X / np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-12)
+
 
 class ClusteringEngine:
     def __init__(self):
         """Initialize advanced clustering with UMAP + HDBSCAN"""
         print("Initializing UMAP + HDBSCAN clustering engine...")
+        # Cached clustering UMAP fit, reused while few files change between runs
+        self._umap_model = None
+        self._umap_params = None  # (n_neighbors, n_components) of the cached fit
+        self._fit_keys = set()  # file hashes the cached model was fitted on
+        self._reduced_by_key = {}  # {file_hash: reduced vector}
+        # Fits on a FAISS k-NN graph have no UMAP transform(): new rows are placed
+        # among their nearest fitted rows instead, see _project
+        self._faiss_index = None  # HNSW index over the fitted (unit-length) rows
+        self._faiss_reduced = None  # reduced vectors of those rows, in index order
+        self._clusterer = None  # last HDBSCAN fit, for assign_clusters()
+        self._clusterer_gpu = False  # whether that fit (and _umap_model) came from cuML
+        self._last_fit = None  # ((keys, min_cluster_size), labels) of that fit
+        self._last_knn = None  # (keys, (knn_indices, knn_dists)) of the last clustering fit
+        # Last 2D layout fit, extended to new files while churn stays small
+        self._layout_fit_keys = set()
+        self._layout_by_key = {}  # {file_hash: (x, y)}
+        self._load_umap_cache()
         
-    def perform_clustering(self, embeddings):
+    def perform_clustering(self, embeddings, keys=None, min_cluster_size=None):
         """
         Advanced semantic clustering using UMAP + HDBSCAN.
         This is state-of-the-art for semantic document clustering.
+        
+        keys: optional per-embedding stable ids (file hashes). When given, the UMAP
+        fit is cached and only new files are projected with transform().
+        min_cluster_size: optional HDBSCAN min_cluster_size (ignored below 10 files).
         """
-        if not embeddings or len(embeddings) == 0:
+        # Same files (by content hash) and parameters as the last fit: same labels
+        fit_key = (list(keys), min_cluster_size) if keys is not None else None
+        if fit_key is not None and self._clusterer is not None and self._last_fit is not None \
+                and self._last_fit[0] == fit_key:
+            print("DEBUG: Embeddings unchanged since the last fit, reusing its labels")
+            return self._last_fit[1].copy()
+        
+        self._clusterer = None  # only a successful fit below is reusable
+        self._last_fit = None
+        if embeddings is None or len(embeddings) == 0:
             return []
         
-        X = np.array(embeddings)
+        X = np.asarray(embeddings, dtype=np.float32)  # no-op for float32 matrices
         n_samples = len(X)
         
         print(f"DEBUG: Clustering {n_samples} files with HDBSCAN + UMAP")
@@ -39,37 +94,41 @@ class ClusteringEngine:
         if not np.isfinite(X).all():
             print("ERROR: Embeddings contains NaNs or Infinities!")
             return [-1] * n_samples
+        
+        # Normalize once so UMAP can use the fast euclidean kernels instead of cosine
+        X = _l2_normalize(X)
+
+        # HDBSCAN automatically finds the number of clusters based on density
+        if n_samples < 10:
+            min_cluster_size = 2
+        elif min_cluster_size is None:
+            min_cluster_size = Config.MIN_CLUSTER_SIZE
+        min_samples = 1 if n_samples < 10 else 2
 
         try:
-            # For small datasets, 'spectral' init can fail or be unstable
-            init_method = 'spectral' if n_samples > 10 else 'random'
-            
-            umap_model = umap.UMAP(
-                n_neighbors=n_neighbors,
-                n_components=n_components,
-                metric='cosine',
-                min_dist=0.0,
-                random_state=42,
-                init=init_method
-            )
-            
-            reduced_embeddings = umap_model.fit_transform(X)
+            if self._use_gpu(n_samples):
+                reduced_embeddings, labels = self._cluster_gpu(
+                    X, keys, n_neighbors, n_components, min_cluster_size, min_samples)
+            else:
+                # For small datasets, 'spectral' init can fail or be unstable
+                init_method = 'spectral' if n_samples > 10 else 'random'
             
-            # Step 2: HDBSCAN clustering
-            # Automatically finds optimal number of clusters based on density
-            min_cluster_size = 2 if n_samples < 10 else 3
-            min_samples = 1 if n_samples < 10 else 2
+                reduced_embeddings = self._reduce_for_clustering(
+                    X, keys, n_neighbors, n_components, init_method)
             
-            print(f"DEBUG: HDBSCAN clustering (min_cluster_size={min_cluster_size}, min_samples={min_samples})")
-            clusterer = hdbscan.HDBSCAN(
-                min_cluster_size=min_cluster_size,
-                min_samples=min_samples,
-                metric='euclidean',
-                cluster_selection_method='eom',  # Excess of Mass
-                prediction_data=True
-            )
+                # Step 2: HDBSCAN clustering
+                print(f"DEBUG: HDBSCAN clustering (min_cluster_size={min_cluster_size}, min_samples={min_samples})")
+                clusterer = hdbscan.HDBSCAN(
+                    min_cluster_size=min_cluster_size,
+                    min_samples=min_samples,
+                    metric='euclidean',
+                    cluster_selection_method='eom',  # Excess of Mass
+                    prediction_data=True
+                )
             
-            labels = clusterer.fit_predict(reduced_embeddings)
+                labels = clusterer.fit_predict(reduced_embeddings)
+                self._clusterer = clusterer
+                self._clusterer_gpu = False
         except Exception as e:
             print(f"ERROR: Clustering failed: {str(e)}")
             import traceback
@@ -79,23 +138,26 @@ class ClusteringEngine:
         
         # Step 3: Quality metrics
         n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
-        n_noise = list(labels).count(-1)
+        n_noise = int((labels == -1).sum())
         
         print(f"DEBUG: Found {n_clusters} clusters, {n_noise} noise points")
         
-        # Calculate quality scores
-        if n_clusters > 1 and n_samples > n_clusters:
-            # Only calculate for non-noise points
-            non_noise_mask = labels != -1
-            if np.sum(non_noise_mask) > 1:
+        # Quality scores are O(N^2) and only feed a debug print, so they're opt-in
+        if Config.CLUSTER_METRICS and n_clusters > 1 and n_samples > n_clusters:
+            # Only calculate for non-noise points, sampled to bound the pairwise pass
+            idx = np.flatnonzero(labels != -1)
+            if len(idx) > Config.CLUSTER_METRICS_SAMPLE:
+                rng = np.random.default_rng(42)
+                idx = rng.choice(idx, Config.CLUSTER_METRICS_SAMPLE, replace=False)
+            if len(idx) > 1:
                 try:
                     silhouette = silhouette_score(
-                        reduced_embeddings[non_noise_mask], 
-                        labels[non_noise_mask]
+                        reduced_embeddings[idx], 
+                        labels[idx]
                     )
                     davies_bouldin = davies_bouldin_score(
-                        reduced_embeddings[non_noise_mask],
-                        labels[non_noise_mask]
+                        reduced_embeddings[idx],
+                        labels[idx]
                     )
                     print(f"DEBUG: Quality - Silhouette: {silhouette:.3f}, Davies-Bouldin: {davies_bouldin:.3f}")
                     print(f"DEBUG: (Silhouette: higher=better, Davies-Bouldin: lower=better)")
@@ -103,45 +165,272 @@ class ClusteringEngine:
                     pass
         
         # Show cluster sizes
-        unique_labels = set(labels)
-        for label in sorted(unique_labels):
-            count = list(labels).count(label)
+        unique_labels, counts = np.unique(labels, return_counts=True)
+        for label, count in zip(unique_labels, counts):
             if label == -1:
                 print(f"DEBUG: Noise: {count} files")
             else:
                 print(f"DEBUG: Cluster {label}: {count} files")
         
+        if fit_key is not None and self._clusterer is not None:
+            self._last_fit = (fit_key, labels.copy())
+        return labels
+
+    def assign_clusters(self, embeddings, keys):
+        """
+        Labels new/changed embeddings against the last clustering without refitting:
+        UMAP transform() into the cached space, then HDBSCAN approximate_predict.
+        Returns the labels, or None when no reusable fit exists (caller should recluster).
+        """
+        if self._clusterer is None or not self._has_fit() or len(embeddings) == 0:
+            return None
+        
+        X = np.asarray(embeddings, dtype=np.float32)
+        if not np.isfinite(X).all():
+            return None
+        X = _l2_normalize(X)
+        
+        try:
+            reduced = self._project(X)
+            if self._clusterer_gpu:
+                labels, _ = cu_approximate_predict(self._clusterer, reduced)
+                labels = np.asarray(labels)
+            else:
+                labels, _ = hdbscan.approximate_predict(self._clusterer, reduced)
+        except Exception as e:
+            print(f"DEBUG: Incremental cluster assignment failed: {e}")
+            return None
+        
+        # The next full pass can reuse these projections too
+        for k, vec in zip(keys, reduced):
+            self._reduced_by_key[k] = vec
+        print(f"DEBUG: Assigned {len(labels)} files to existing clusters")
         return labels
 
-    def reduce_dimensions(self, embeddings):
+    def summarize_clusters(self, embeddings, labels, top_k=5):
+        """
+        Groups embeddings by label in one pass and computes, per cluster, the
+        centroid and the top_k members closest to it (cosine distance).
+        
+        Returns:
+            Dict of {label: (centroid, member_indices)} - indices into embeddings,
+            most representative first. Noise (-1) keeps its first top_k members.
+        """
+        labels = np.asarray(labels)
+        if len(labels) == 0:
+            return {}
+        X = np.asarray(embeddings, dtype=np.float32)
+        
+        order = np.argsort(labels, kind='stable')
+        boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+        
+        summary = {}
+        for members in np.split(order, boundaries):
+            label = int(labels[members[0]])
+            Xm = X[members]
+            centroid = Xm.mean(axis=0)
+            if label == -1:
+                summary[label] = (centroid, members[:top_k])
+                continue
+            norms = np.linalg.norm(Xm, axis=1) * np.linalg.norm(centroid)
+            dists = 1.0 - (Xm @ centroid) / np.maximum(norms, 1e-12)
+            summary[label] = (centroid, members[np.argsort(dists)[:top_k]])
+        return summary
+
+    def _use_gpu(self, n_samples):
+        return cuUMAP is not None and Config.GPU_CLUSTERING and n_samples >= Config.GPU_MIN_SAMPLES
+
+    def _cluster_gpu(self, X, keys, n_neighbors, n_components, min_cluster_size, min_samples):
+        """
+        UMAP + HDBSCAN on the GPU with cuML (numpy in, numpy out). The fit is kept in
+        memory for assign_clusters() but not pickled: loading it needs a GPU again.
+        """
+        print(f"DEBUG: cuML GPU clustering (min_cluster_size={min_cluster_size}, min_samples={min_samples})")
+        umap_model = cuUMAP(
+            n_neighbors=n_neighbors,
+            n_components=n_components,
+            metric='euclidean',  # on unit vectors: ||a-b||^2 = 2(1 - cos)
+            min_dist=0.0,
+            random_state=42
+        )
+        reduced = np.asarray(umap_model.fit_transform(X), dtype=np.float32)
+        clusterer = cuHDBSCAN(
+            min_cluster_size=min_cluster_size,
+            min_samples=min_samples,
+            metric='euclidean',
+            cluster_selection_method='eom',
+            prediction_data=True
+        )
+        labels = np.asarray(clusterer.fit_predict(reduced))
+        
+        self._clusterer = clusterer
+        self._clusterer_gpu = True
+        self._last_knn = None  # cuML keeps its k-NN graph on the device
+        self._faiss_index = None
+        if keys is not None:
+            self._umap_model = umap_model
+            self._umap_params = (n_neighbors, n_components)
+            self._fit_keys = set(keys)
+            self._reduced_by_key = dict(zip(keys, reduced))
+        return reduced, labels
+
+    def _reduce_for_clustering(self, X, keys, n_neighbors, n_components, init_method):
+        """UMAP-reduces X for HDBSCAN, reusing the cached fit when churn is small"""
+        params = (n_neighbors, n_components)
+        
+        if keys is not None and self._has_fit() and self._umap_params == params:
+            key_set = set(keys)
+            added = len(key_set - self._fit_keys)
+            removed = len(self._fit_keys - key_set)
+            churn = (added + removed) / len(key_set)
+            
+            if churn <= Config.UMAP_REFIT_FRACTION:
+                new_idx = [i for i, k in enumerate(keys) if k not in self._reduced_by_key]
+                print(f"DEBUG: Reusing cached UMAP fit (churn {churn:.0%}, projecting {len(new_idx)} files)")
+                try:
+                    if new_idx:
+                        projected = self._project(X[new_idx])
+                        for i, vec in zip(new_idx, projected):
+                            self._reduced_by_key[keys[i]] = vec
+                    return np.vstack([self._reduced_by_key[k] for k in keys])
+                except Exception as e:
+                    print(f"DEBUG: UMAP transform failed, refitting: {e}")
+            else:
+                print(f"DEBUG: Corpus churn {churn:.0%} > {Config.UMAP_REFIT_FRACTION:.0%}, refitting UMAP")
+        
+        knn, index = self._hnsw_knn(X, n_neighbors)
+        umap_model = umap.UMAP(
+            n_neighbors=n_neighbors,
+            n_components=n_components,
+            metric='euclidean',  # on unit vectors: ||a-b||^2 = 2(1 - cos)
+            min_dist=0.0,
+            random_state=42,
+            init=init_method,
+            precomputed_knn=knn,
+            low_memory=True
+        )
+        reduced = umap_model.fit_transform(X)
+        
+        # Keep the k-NN graph so reduce_dimensions() can skip its own neighbor search
+        knn_indices = knn[0] if knn[0] is not None else getattr(umap_model, '_knn_indices', None)
+        knn_dists = knn[1] if knn[1] is not None else getattr(umap_model, '_knn_dists', None)
+        if keys is not None and knn_indices is not None and knn_dists is not None:
+            self._last_knn = (list(keys), (knn_indices, knn_dists))
+        else:
+            self._last_knn = None
+        
+        if keys is None:
+            self._umap_model = None
+            self._faiss_index = None
+            self._fit_keys = set()
+            self._reduced_by_key = {}
+            return reduced
+        
+        self._umap_params = params
+        self._fit_keys = set(keys)
+        self._reduced_by_key = dict(zip(keys, reduced))
+        if knn[0] is None:
+            self._umap_model = umap_model
+            self._faiss_index = None
+            self._save_umap_cache()
+        else:
+            # A FAISS-built graph leaves UMAP without a search index, so transform() is
+            # unavailable; _project places new rows with the FAISS index instead. That
+            # index isn't pickled, so this fit lasts for the process only.
+            self._umap_model = None
+            self._faiss_index = index
+            self._faiss_reduced = np.asarray(reduced, dtype=np.float32)
+        return reduced
+
+    def _has_fit(self):
+        """Whether _project can place new rows in the cached clustering space"""
+        return self._umap_model is not None or self._faiss_index is not None
+
+    def _project(self, X):
+        """
+        Reduced-space positions of unit-length rows X under the cached fit: UMAP
+        transform(), or for FAISS-graph fits the similarity-weighted mean of each row's
+        nearest fitted rows (as _extend_layout does for the 2D layout).
+        """
+        if self._umap_model is not None:
+            return self._umap_model.transform(X)
+        k = min(self._umap_params[0], len(self._faiss_reduced))
+        sims, idx = self._faiss_index.search(np.ascontiguousarray(X, dtype=np.float32), k)
+        weights = np.where(idx >= 0, np.maximum(sims, 1e-6), 0.0)  # -1: fewer than k hits
+        neighbors = self._faiss_reduced[np.maximum(idx, 0)]  # (rows, k, n_components)
+        return (weights[..., None] * neighbors).sum(axis=1) / np.maximum(weights.sum(axis=1, keepdims=True), 1e-12)
+
+    def _load_umap_cache(self):
+        if not os.path.exists(Config.UMAP_CACHE_PATH):
+            return
+        try:
+            with open(Config.UMAP_CACHE_PATH, 'rb') as f:
+                cache = pickle.load(f)
+            self._umap_model = cache['model']
+            self._umap_params = cache['params']
+            self._fit_keys = cache['fit_keys']
+            self._reduced_by_key = cache['reduced_by_key']
+            print(f"DEBUG: Loaded cached UMAP fit ({len(self._fit_keys)} files)")
+        except Exception as e:
+            print(f"DEBUG: Ignoring unreadable UMAP cache: {e}")
+
+    def _save_umap_cache(self):
+        try:
+            os.makedirs(os.path.dirname(Config.UMAP_CACHE_PATH), exist_ok=True)
+            with open(Config.UMAP_CACHE_PATH, 'wb') as f:
+                pickle.dump({
+                    'model': self._umap_model,
+                    'params': self._umap_params,
+                    'fit_keys': self._fit_keys,
+                    'reduced_by_key': self._reduced_by_key,
+                }, f)
+        except Exception as e:
+            print(f"DEBUG: Could not save UMAP cache: {e}")
+
+    def reduce_dimensions(self, embeddings, keys=None):
         """
         Reduces embeddings to 2D for visualization using UMAP.
         UMAP preserves semantic structure better than PCA.
+        
+        keys: optional file hashes; if they match the last clustering fit, its k-NN
+        graph is reused instead of searching neighbors again. While few files changed
+        since the last layout fit, that layout is kept and only new files are placed.
         """
-        if not embeddings or len(embeddings) == 0:
+        if embeddings is None or len(embeddings) == 0:
             return []
 
-        X = np.array(embeddings)
+        X = np.asarray(embeddings, dtype=np.float32)  # no-op for float32 matrices
         n_samples = X.shape[0]
         
         if n_samples < 2:
             return [(0.0, 0.0)] * n_samples
 
+        X = _l2_normalize(X)
+
         # Use UMAP for better visualization
         # UMAP needs at least 2 neighbors and n_samples > n_components
         n_neighbors = max(2, min(15, n_samples - 1))
         init_method = 'spectral' if n_samples > 10 else 'random'
         
+        coords = self._extend_layout(X, keys, n_neighbors)
+        if coords is not None:
+            return coords
+        
         try:
             umap_model = umap.UMAP(
                 n_neighbors=n_neighbors,
                 n_components=2,
-                metric='cosine',
+                metric='euclidean',  # rows are unit-length, see _l2_normalize
                 min_dist=0.1,
                 random_state=42,
-                init=init_method
+                init=init_method,
+                precomputed_knn=self._shared_knn(X, keys, n_neighbors),
+                low_memory=False
             )
             reduced = umap_model.fit_transform(X)
+            if keys is not None:
+                self._layout_fit_keys = set(keys)
+                self._layout_by_key = dict(zip(keys, reduced))
             return reduced.tolist()
         except:
             # Fallback to PCA if UMAP fails
@@ -154,3 +443,184 @@ class ClusteringEngine:
                 return [(float(x[0]), 0.0) for x in reduced]
                 
             return reduced.tolist()
+
+    def _extend_layout(self, X, keys, n_neighbors):
+        """
+        The last layout with new files placed at the similarity-weighted mean of their
+        n_neighbors nearest laid-out files, or None when it should be refit. Works for
+        fits on a precomputed k-NN graph too, where UMAP transform() is unavailable.
+        """
+        if keys is None or not self._layout_fit_keys:
+            return None
+        key_set = set(keys)
+        added = len(key_set - self._layout_fit_keys)
+        removed = len(self._layout_fit_keys - key_set)
+        if (added + removed) / len(key_set) > Config.UMAP_REFIT_FRACTION:
+            return None
+        
+        known = [i for i, k in enumerate(keys) if k in self._layout_by_key]
+        new = [i for i, k in enumerate(keys) if k not in self._layout_by_key]
+        if not known:
+            return None
+        coords = np.empty((len(keys), 2), dtype=np.float32)
+        coords[known] = np.asarray([self._layout_by_key[keys[i]] for i in known])
+        
+        if new:
+            # Cosine similarity: rows of X are unit-length
+            sims = X[new] @ X[known].T
+            k = min(n_neighbors, len(known))
+            top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            weights = np.maximum(np.take_along_axis(sims, top, axis=1), 1e-6)
+            neighbors = coords[known][top]  # (new, k, 2)
+            coords[new] = (weights[..., None] * neighbors).sum(axis=1) / weights.sum(axis=1, keepdims=True)
+        
+        self._layout_by_key = dict(zip(keys, coords))
+        print(f"DEBUG: Reusing 2D layout (placed {len(new)} new files)")
+        return coords.tolist()
+
+    def _shared_knn(self, X, keys, n_neighbors):
+        """The last clustering fit's k-NN graph when it was built on exactly these rows"""
+        if keys is not None and self._last_knn is not None:
+            fit_keys, (indices, dists) = self._last_knn
+            if len(fit_keys) == len(keys) and indices.shape[1] >= n_neighbors and list(keys) == fit_keys:
+                print("DEBUG: Reusing clustering k-NN graph for the 2D layout")
+                return (indices[:, :n_neighbors], dists[:, :n_neighbors], None)
+        return self._precomputed_knn(X, n_neighbors)
+
+    def _precomputed_knn(self, X, n_neighbors):
+        """
+        Builds the k-NN graph of L2-normalized X with a FAISS HNSW index for large corpora.
+        Returns a UMAP precomputed_knn tuple; (None, None, None) lets UMAP search itself.
+        """
+        return self._hnsw_knn(X, n_neighbors)[0]
+
+    def _hnsw_knn(self, X, n_neighbors):
+        """_precomputed_knn plus the FAISS index it searched (None when UMAP searches itself)"""
+        if faiss is None or len(X) < Config.FAISS_MIN_SAMPLES:
+            return (None, None, None), None
+        
+        # Inner product on L2-normalized vectors == cosine similarity
+        Xn = np.ascontiguousarray(X, dtype=np.float32)
+        
+        index = faiss.IndexHNSWFlat(Xn.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efSearch = max(64, 2 * n_neighbors)
+        index.add(Xn)
+        sims, indices = index.search(Xn, n_neighbors)
+        print(f"DEBUG: FAISS HNSW k-NN graph built ({len(Xn)} points, k={n_neighbors})")
+        
+        # Euclidean distance between unit vectors, matching UMAP's metric
+        dists = np.sqrt(np.maximum(2.0 - 2.0 * sims, 0.0)).astype(np.float32)
+        return (indices.astype(np.int64), dists, None), index
+
+
+def _serve(conn):
+    """Child process loop of ClusteringProcess: runs ClusteringEngine methods on request"""
+    engine = ClusteringEngine()
+    shm = None  # the parent's current embedding matrix segment
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        method, ref, args, kwargs = request
+        X = None
+        try:
+            if ref[0] == 'shm':
+                _, name, shape = ref
+                if shm is None or shm.name != name:
+                    if shm is not None:
+                        shm.close()
+                    shm = shared_memory.SharedMemory(name=name)
+                X = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+            else:
+                X = ref[1]
+            conn.send((True, getattr(engine, method)(X, *args, **kwargs)))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+        finally:
+            del X  # drop the view so the segment can be closed
+    if shm is not None:
+        shm.close()
+
+
+class ClusteringProcess:
+    """
+    ClusteringEngine in a child process, so multi-second UMAP/HDBSCAN fits don't hold
+    the parent's GIL (UI, file ingestion, AI naming keep running). The embedding matrix
+    goes through shared memory once per pass; the fitted state lives in the child.
+    Falls back to an in-process engine when disabled or if the child dies.
+    """
+
+    def __init__(self):
+        self._local = None
+        self._conn = None
+        self._process = None
+        self._shm = None
+        self._shared = None  # the matrix currently mirrored in _shm
+        if not Config.CLUSTER_IN_SUBPROCESS:
+            self._local = ClusteringEngine()
+            return
+        
+        # spawn: forking a process that runs Qt and torch threads isn't safe
+        ctx = mp.get_context('spawn')
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(target=_serve, args=(child_conn,), name="sefs-cluster", daemon=True)
+        self._process.start()
+        child_conn.close()
+        print("Clustering engine started in a child process")
+
+    def perform_clustering(self, embeddings, keys=None, min_cluster_size=None):
+        return self._call('perform_clustering', embeddings, keys=keys, min_cluster_size=min_cluster_size)
+
+    def assign_clusters(self, embeddings, keys):
+        return self._call('assign_clusters', embeddings, keys)
+
+    def summarize_clusters(self, embeddings, labels, top_k=5):
+        return self._call('summarize_clusters', embeddings, labels, top_k=top_k)
+
+    def reduce_dimensions(self, embeddings, keys=None):
+        return self._call('reduce_dimensions', embeddings, keys=keys)
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.send(None)
+                self._process.join(timeout=5)
+            except (OSError, ValueError):
+                pass
+            self._conn.close()
+            self._conn = None
+        self._release_shm()
+
+    def _call(self, method, embeddings, *args, **kwargs):
+        if self._local is None:
+            try:
+                self._conn.send((method, self._array_ref(embeddings), args, kwargs))
+                ok, result = self._conn.recv()
+            except (EOFError, OSError) as e:
+                print(f"DEBUG: Clustering process died ({e}), clustering in-process from now on")
+                self.close()
+                self._local = ClusteringEngine()
+            else:
+                if not ok:
+                    raise RuntimeError(f"Clustering {method} failed: {result}")
+                return result
+        return getattr(self._local, method)(embeddings, *args, **kwargs)
+
+    def _array_ref(self, X):
+        """Small arrays travel inline; big ones via a shared segment reused while X is"""
+        X = np.ascontiguousarray(X, dtype=np.float32)  # no-op for the stacked matrix
+        if X.nbytes < _INLINE_BYTES:
+            return ('inline', X)
+        if X is not self._shared:
+            self._release_shm()
+            self._shm = shared_memory.SharedMemory(create=True, size=X.nbytes)
+            np.ndarray(X.shape, dtype=np.float32, buffer=self._shm.buf)[:] = X
+            self._shared = X
+        return ('shm', self._shm.name, X.shape)
+
+    def _release_shm(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+            self._shared = None
@@ -8,17 +8,48 @@ class Config:
     APP_NAME = "Semantic Entropy File System"
     VERSION = "4.0.0" # Semantic Restoration
     DB_PATH = os.path.join("data", "sefs.db")
+    UMAP_CACHE_PATH = os.path.join("data", "umap.pkl")
     
     # Semantic params
     MAX_TEXT_LENGTH = 10000
+    HASH_CHUNK = 1 << 20  # Bytes read per update() when hashing files
+    HASH_WORKERS = min(8, os.cpu_count() or 1)  # Threads hashing files during the initial scan
     EMBEDDING_MODEL_NAME = 'all-mpnet-base-v2'  # Upgraded from MiniLM for better accuracy
+    EMBED_BATCH = 64  # Texts per sentence-transformer forward pass
+    EMBEDDING_STORE_DTYPE = 'float16'  # On-disk embedding precision; computed in float32
+    EMBED_THREADS = max(1, (os.cpu_count() or 2) // 2)  # torch intra-op threads (~physical cores)
+    USE_ONNX = False  # Run the embedding model on ONNX Runtime (needs sentence-transformers[onnx])
     DBSCAN_EPS = 0.3  # Reduced for better semantic separation (was 0.5)
     DBSCAN_MIN_SAMPLES = 2  # Increased to 2 for more stable clusters
+    UMAP_REFIT_FRACTION = 0.10  # Refit UMAP once this share of files was added/removed since the last fit
+    NOISE_REFIT_FRACTION = 0.10  # Full recluster once incremental noise grew by this share of files
+    FAISS_MIN_SAMPLES = 5000  # Use a FAISS HNSW k-NN graph for UMAP above this many files
+    MIN_CLUSTER_SIZE = 3  # HDBSCAN min_cluster_size floor (corpora of 10+ files)
+    MIN_CLUSTER_SIZE_DIVISOR = 20  # ...raised to N // this for large corpora
+    GPU_CLUSTERING = True  # Run UMAP + HDBSCAN on the GPU via RAPIDS cuML when installed
+    GPU_MIN_SAMPLES = 10000  # ...but only above this many files; below it the CPU path is fast enough
+    CLUSTER_METRICS = False  # Log silhouette/Davies-Bouldin after clustering (O(N^2))
+    CLUSTER_METRICS_SAMPLE = 2000  # Max non-noise points sampled for those metrics
+    CLUSTER_IN_SUBPROCESS = True  # Fit UMAP/HDBSCAN in a child process (embeddings via shared memory)
+    
+    # Watcher: bursts of events are coalesced, then processed + reclustered once
+    EVENT_DEBOUNCE_SEC = 0.5  # Quiet time that ends a burst
+    EVENT_BATCH_MAX_SEC = 3.0  # Upper bound on how long a burst is collected
+    RECLUSTER_QUIET_SEC = 2.0  # Recluster once no event arrived for this long...
+    RECLUSTER_MAX_DELAY_SEC = 10.0  # ...or at the latest this long after the first pending change
+    STABLE_PROBE_SEC = 1.0  # Files modified this recently are re-stat'ed once before hashing...
+    STABLE_PROBE_INTERVAL = 0.05  # ...this long later; still growing means retry after the next quiet window
+    SELF_MOVE_IGNORE_SEC = 5.0  # Watcher drops events on paths SEFS itself just moved for this long
     
     # AI Naming Configuration
     USE_AI_NAMING = True  # Enabled for semantic naming
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')  # Set via environment variable
     GEMINI_MODEL = 'gemini-2.5-flash'  # Upgraded to 1.5 Flash for better accuracy and speed
+    AI_NAME_TTL_DAYS = None  # Expire persisted AI names after N days (None = keep forever)
+    SEMANTIC_CACHE_THRESHOLD = 0.92  # Reuse a cached name if cluster centroids are this cosine-similar
+    GEMINI_RPM = 10  # Requests/minute quota enforced client-side by a token bucket
+    AI_NAMER_CONCURRENCY = 5  # Max parallel Gemini requests, safely under the RPM quota
     
     # We restrict to text-readable files for semantic analysis
-    EXTENSIONS = ['.txt', '.pdf', '.md', '.log', '.csv', '.docx', '.doc']
+    EXTENSIONS = ('.txt', '.pdf', '.md', '.log', '.csv', '.docx', '.doc')
+    EXTENSION_SET = frozenset(EXTENSIONS)  # O(1) membership for per-file/per-event checks
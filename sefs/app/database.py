@@ -1,17 +1,72 @@
 import sqlite3
 import os
 import datetime
+import threading
+from contextlib import contextmanager
 from .config import Config
 
 class DatabaseManager:
+    """
+    SQLite access with one long-lived connection per thread.
+    `conn`/`cursor` resolve to the calling thread's connection, opened on first use.
+    """
     def __init__(self, db_path=None):
         self.db_path = db_path or Config.DB_PATH
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.cursor = self.conn.cursor()
+        self._tls = threading.local()
+        self._connections = []  # every connection opened, for close()
+        self._connections_lock = threading.Lock()
         self._create_tables()
         self._migrate_schema()
 
+    @property
+    def conn(self):
+        conn = getattr(self._tls, 'conn', None)
+        if conn is None:
+            # check_same_thread=False only so close() can shut every thread's connection
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row  # rows index by position or column name
+            self._apply_pragmas(conn)
+            self._tls.conn = conn
+            self._tls.cursor = conn.cursor()
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @property
+    def cursor(self):
+        self.conn  # ensure this thread's connection exists
+        return self._tls.cursor
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group writes into one transaction: methods called inside skip their own
+        commit and everything is committed (or rolled back) once on exit. Nests.
+        """
+        self.conn  # ensure this thread's connection exists
+        self._tls.depth = getattr(self._tls, 'depth', 0) + 1
+        try:
+            yield self
+        except BaseException:
+            self._tls.depth -= 1
+            if self._tls.depth == 0:
+                self.conn.rollback()
+            raise
+        self._tls.depth -= 1
+        if self._tls.depth == 0:
+            self.conn.commit()
+
+    def _commit(self):
+        if not getattr(self._tls, 'depth', 0):
+            self.conn.commit()
+
+    def _apply_pragmas(self, conn):
+        """WAL + relaxed sync: one cheap WAL append per commit instead of a full fsync"""
+        for pragma in ("journal_mode=WAL", "synchronous=NORMAL", "temp_store=MEMORY",
+                       "mmap_size=268435456", "cache_size=-65536"):
+            conn.execute(f"PRAGMA {pragma}")
+
     def _create_tables(self):
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS files (
@@ -21,44 +76,149 @@ class DatabaseManager:
                 embedding BLOB,
                 cluster_id INTEGER DEFAULT -1,
                 last_modified TIMESTAMP,
-                content_sample TEXT
+                content_sample TEXT,
+                size INTEGER,
+                mtime_ns INTEGER
             )
         ''')
-        self.conn.commit()
+        # AI folder names keyed by content hash; kept across clear_all() so re-runs skip Gemini
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ai_name_cache (
+                hash TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                ts TIMESTAMP,
+                centroid BLOB
+            )
+        ''')
+        # Small key/value settings, e.g. which model produced the stored embeddings
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        # Label and dedupe-by-hash lookups, without scanning rows full of embedding BLOBs
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS ix_files_cluster ON files(cluster_id)')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS ix_files_hash ON files(file_hash)')
+        self._commit()
     
     def _migrate_schema(self):
-        """Add content_sample column if it doesn't exist"""
+        """Add content_sample / size / mtime_ns / centroid columns if they don't exist"""
         try:
             self.cursor.execute("PRAGMA table_info(files)")
             columns = [row[1] for row in self.cursor.fetchall()]
-            if 'content_sample' not in columns:
-                print("DB Migration: adding content_sample column...")
-                self.cursor.execute("ALTER TABLE files ADD COLUMN content_sample TEXT")
-                self.conn.commit()
+            for column, col_type in (('content_sample', 'TEXT'), ('size', 'INTEGER'), ('mtime_ns', 'INTEGER')):
+                if column not in columns:
+                    print(f"DB Migration: adding {column} column...")
+                    self.cursor.execute(f"ALTER TABLE files ADD COLUMN {column} {col_type}")
+                    self._commit()
+                    print("Migration complete.")
+            self.cursor.execute("PRAGMA table_info(ai_name_cache)")
+            columns = [row[1] for row in self.cursor.fetchall()]
+            if 'centroid' not in columns:
+                print("DB Migration: adding ai_name_cache.centroid column...")
+                self.cursor.execute("ALTER TABLE ai_name_cache ADD COLUMN centroid BLOB")
+                self._commit()
                 print("Migration complete.")
         except Exception as e:
             print(f"Migration error (can be ignored): {e}")
 
-    def upsert_file(self, file_path, file_hash, embedding, last_modified, content_sample=None):
+    def upsert_file(self, file_path, file_hash, embedding, last_modified, content_sample=None,
+                    size=None, mtime_ns=None):
         """Insert or update file record"""
-        file_path = os.path.normpath(file_path)
-        
-        self.cursor.execute('''
-            INSERT INTO files (file_path, file_hash, embedding, last_modified, content_sample)
-            VALUES (?, ?, ?, ?, ?)
+        self.upsert_files_bulk([(file_path, file_hash, embedding, last_modified, content_sample,
+                                 size, mtime_ns)])
+
+    def upsert_files_bulk(self, items):
+        """
+        Insert or update many file records in a single transaction.
+        items: iterable of (file_path, file_hash, embedding, last_modified, content_sample, size, mtime_ns)
+        """
+        rows = [(os.path.normpath(item[0]),) + tuple(item[1:]) for item in items]
+        if not rows:
+            return
+        self.cursor.executemany('''
+            INSERT INTO files (file_path, file_hash, embedding, last_modified, content_sample, size, mtime_ns)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(file_path) DO UPDATE SET
                 file_hash=excluded.file_hash,
                 embedding=excluded.embedding,
                 last_modified=excluded.last_modified,
-                content_sample=excluded.content_sample
-        ''', (file_path, file_hash, embedding, last_modified, content_sample))
-        self.conn.commit()
+                content_sample=excluded.content_sample,
+                size=excluded.size,
+                mtime_ns=excluded.mtime_ns
+        ''', rows)
+        self._commit()
 
     def get_file(self, file_path):
         file_path = os.path.normpath(file_path)
         self.cursor.execute('SELECT * FROM files WHERE file_path = ?', (file_path,))
         return self.cursor.fetchone()
 
+    def get_file_hash(self, file_path):
+        """Return the stored hash for file_path (None if untracked) without loading the embedding"""
+        file_path = os.path.normpath(file_path)
+        self.cursor.execute('SELECT file_hash FROM files WHERE file_path = ?', (file_path,))
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def get_fingerprints(self, file_paths):
+        """Return {file_path: (file_hash, size, mtime_ns)} for the tracked paths among file_paths"""
+        paths = [os.path.normpath(p) for p in file_paths]
+        result = {}
+        # Chunked to stay under SQLite's bound-parameter limit
+        for start in range(0, len(paths), 500):
+            chunk = paths[start:start + 500]
+            self.cursor.execute(
+                f'SELECT file_path, file_hash, size, mtime_ns FROM files '
+                f'WHERE file_path IN ({",".join("?" * len(chunk))})', chunk)
+            for path, file_hash, size, mtime_ns in self.cursor.fetchall():
+                result[path] = (file_hash, size, mtime_ns)
+        return result
+
+    def update_fingerprints_bulk(self, items):
+        """Refresh size/mtime_ns for many files in one transaction. items: (file_path, size, mtime_ns)"""
+        rows = [(size, mtime_ns, os.path.normpath(p)) for p, size, mtime_ns in items]
+        if not rows:
+            return
+        self.cursor.executemany('UPDATE files SET size = ?, mtime_ns = ? WHERE file_path = ?', rows)
+        self._commit()
+
+    def get_paths_by_cluster(self, cluster_id):
+        self.cursor.execute('SELECT file_path FROM files WHERE cluster_id = ?', (cluster_id,))
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def get_all_paths(self):
+        """Every tracked file_path, without touching the embedding BLOBs"""
+        self.cursor.execute('SELECT file_path FROM files')
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def get_all_file_meta(self):
+        """
+        Rows shaped like get_all_files() for files with an embedding, but with the
+        BLOB's byte length in place of the embedding itself (SQLite reads it from
+        the record header); fetch vectors with get_embeddings() as needed.
+        """
+        self.cursor.execute('''
+            SELECT id, file_path, file_hash, length(embedding) AS embedding_size, cluster_id,
+                   last_modified, content_sample, size, mtime_ns
+            FROM files WHERE length(embedding) > 2
+        ''')
+        return self.cursor.fetchall()
+
+    def get_embeddings(self, file_hashes):
+        """Return {file_hash: embedding_blob} for the given hashes"""
+        hashes = list(file_hashes)
+        result = {}
+        # Chunked to stay under SQLite's bound-parameter limit
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            self.cursor.execute(
+                f'SELECT file_hash, embedding FROM files '
+                f'WHERE file_hash IN ({",".join("?" * len(chunk))})', chunk)
+            result.update(self.cursor.fetchall())
+        return result
+
     def get_all_files(self):
         self.cursor.execute('SELECT * FROM files')
         return self.cursor.fetchall()
@@ -66,16 +226,96 @@ class DatabaseManager:
     def update_cluster(self, file_path, cluster_id):
         file_path = os.path.normpath(file_path)
         self.cursor.execute('UPDATE files SET cluster_id = ? WHERE file_path = ?', (cluster_id, file_path))
-        self.conn.commit()
+        self._commit()
+
+    def update_clusters_bulk(self, items):
+        """Set cluster_id for many files in a single transaction. items: (file_path, cluster_id)"""
+        rows = [(cluster_id, os.path.normpath(p)) for p, cluster_id in items]
+        if not rows:
+            return
+        self.cursor.executemany('UPDATE files SET cluster_id = ? WHERE file_path = ?', rows)
+        self._commit()
 
     def remove_file(self, file_path):
         file_path = os.path.normpath(file_path)
         self.cursor.execute('DELETE FROM files WHERE file_path = ?', (file_path,))
-        self.conn.commit()
+        self._commit()
+
+    def rename_files(self, items):
+        """
+        Repoint moved files in one transaction, keeping their row (embedding included).
+        items: (old_path, new_path); a stale row already at new_path is replaced.
+        """
+        rows = [(os.path.normpath(old), os.path.normpath(new)) for old, new in items]
+        if not rows:
+            return
+        now = datetime.datetime.now()
+        self.cursor.executemany('DELETE FROM files WHERE file_path = ? AND file_path != ?',
+                                [(new, old) for old, new in rows])
+        self.cursor.executemany('UPDATE files SET file_path = ?, last_modified = ? WHERE file_path = ?',
+                                [(new, now, old) for old, new in rows])
+        self._commit()
+
+    def remove_files(self, file_paths):
+        """Delete many file records in one transaction"""
+        paths = [os.path.normpath(p) for p in file_paths]
+        # Chunked to stay under SQLite's bound-parameter limit
+        for start in range(0, len(paths), 500):
+            chunk = paths[start:start + 500]
+            self.cursor.execute(
+                f'DELETE FROM files WHERE file_path IN ({",".join("?" * len(chunk))})', chunk)
+        if paths:
+            self._commit()
+
+    def get_ai_name(self, key, max_age_days=None):
+        """Return a cached AI folder name, or None if missing/expired"""
+        if max_age_days is None:
+            self.cursor.execute('SELECT name FROM ai_name_cache WHERE hash = ?', (key,))
+        else:
+            cutoff = datetime.datetime.now() - datetime.timedelta(days=max_age_days)
+            self.cursor.execute('SELECT name FROM ai_name_cache WHERE hash = ? AND ts >= ?', (key, cutoff))
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def get_ai_name_centroids(self, max_age_days=None):
+        """Return [(name, centroid_blob)] for cached names that have a centroid"""
+        if max_age_days is None:
+            self.cursor.execute('SELECT name, centroid FROM ai_name_cache WHERE centroid IS NOT NULL')
+        else:
+            cutoff = datetime.datetime.now() - datetime.timedelta(days=max_age_days)
+            self.cursor.execute(
+                'SELECT name, centroid FROM ai_name_cache WHERE centroid IS NOT NULL AND ts >= ?', (cutoff,))
+        return self.cursor.fetchall()
+
+    def put_ai_name(self, key, name, centroid=None):
+        """centroid: optional float32 bytes of the cluster centroid for semantic lookups"""
+        if centroid is not None:
+            centroid = sqlite3.Binary(centroid)
+        self.cursor.execute('''
+            INSERT INTO ai_name_cache (hash, name, ts, centroid) VALUES (?, ?, ?, ?)
+            ON CONFLICT(hash) DO UPDATE SET
+                name=excluded.name,
+                ts=excluded.ts,
+                centroid=COALESCE(excluded.centroid, ai_name_cache.centroid)
+        ''', (key, name, datetime.datetime.now(), centroid))
+        self._commit()
+
+    def get_meta(self, key):
+        self.cursor.execute('SELECT value FROM meta WHERE key = ?', (key,))
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        self.cursor.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+        self._commit()
 
     def clear_all(self):
         self.cursor.execute('DELETE FROM files')
-        self.conn.commit()
+        self._commit()
 
     def close(self):
-        self.conn.close()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._tls = threading.local()
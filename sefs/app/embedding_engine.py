@@ -1,57 +1,164 @@
 from sentence_transformers import SentenceTransformer
+import torch
 import os
+import re
 import hashlib
+import mmap
+import numpy as np
 import fitz  # PyMuPDF
 from .config import Config
 
+# Formats read as plain UTF-8 text (everything else needs its own parser)
+_TEXT_EXTENSIONS = frozenset(['.txt', '.md', '.log', '.csv', '.py', '.js', '.html'])
+
+# Plain extraction: whitespace is collapsed by _preprocess_text anyway, so skip
+# TEXT_PRESERVE_WHITESPACE layout work (ligatures/clipping as in the defaults)
+_PDF_TEXT_FLAGS = fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_MEDIABOX_CLIP
+
+try:
+    import docx  # Optional: python-docx for Word documents
+except ImportError:
+    docx = None
+
+try:
+    import xxhash  # Optional: fast non-cryptographic content hashing
+except ImportError:
+    xxhash = None
+
+try:
+    import blake3  # Optional: SIMD hashing, used if xxhash is missing
+except ImportError:
+    blake3 = None
+
+
+# Name of the digest _new_file_hasher uses. File hashes are persisted (files.file_hash,
+# UMAP cache), so it is part of the stored embedding format: see Worker.__init__
+if xxhash is not None:
+    FILE_HASH_ALGORITHM = 'xxh3_128'
+elif blake3 is not None:
+    FILE_HASH_ALGORITHM = 'blake3'
+else:
+    FILE_HASH_ALGORITHM = 'sha256'
+
+
+def _new_file_hasher():
+    """File hashes only detect content changes, so take the fastest available digest"""
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    if blake3 is not None:
+        return blake3.blake3()
+    return hashlib.sha256()  # OpenSSL, SHA-NI where the CPU has it
+
+# Characters kept by _preprocess_text: word chars, whitespace and basic punctuation
+_CLEAN_RE = re.compile(r'[^\w\s.,!?\-]')
+_WS_RE = re.compile(r'\s+')
+# Same filter for pure-ASCII text as a C-level translate table (no regex engine)
+_ASCII_CLEAN = str.maketrans({chr(c): ' ' for c in range(128) if _CLEAN_RE.match(chr(c))})
+
+
+def encode_embedding(vec):
+    """Embedding -> DB BLOB at Config.EMBEDDING_STORE_DTYPE (half the bytes of float32)"""
+    return np.asarray(vec).astype(Config.EMBEDDING_STORE_DTYPE, copy=False).tobytes()
+
+
+def decode_embedding(blob):
+    """DB BLOB -> float32 embedding for clustering"""
+    return np.frombuffer(blob, dtype=Config.EMBEDDING_STORE_DTYPE).astype(np.float32)
+
+
+def decode_embeddings(blobs):
+    """Equal-length DB BLOBs -> one contiguous (N, D) float32 matrix, a single conversion pass"""
+    flat = np.frombuffer(b''.join(blobs), dtype=Config.EMBEDDING_STORE_DTYPE)
+    return flat.reshape(len(blobs), -1).astype(np.float32)
+
+
 class EmbeddingEngine:
     def __init__(self):
         # Initialize the model.
         print("Loading Embedding Model...")
-        self.model = SentenceTransformer(Config.EMBEDDING_MODEL_NAME)
+        torch.set_num_threads(Config.EMBED_THREADS)
+        self.model = self._load_model()
         print("Model Loaded.")
 
+    def _load_model(self):
+        """ONNX Runtime backend if enabled and available, else torch (FP16 on CUDA)"""
+        if Config.USE_ONNX:
+            try:
+                model = SentenceTransformer(Config.EMBEDDING_MODEL_NAME, backend='onnx')
+                print("DEBUG: Using ONNX Runtime embedding backend")
+                return model
+            except Exception as e:
+                print(f"DEBUG: ONNX backend unavailable, using torch: {e}")
+        
+        model = SentenceTransformer(Config.EMBEDDING_MODEL_NAME)
+        model.eval()
+        if model.device.type == 'cuda':
+            model.half()
+        return model
+
     def compute_file_hash(self, file_path):
-        """Computes SHA256 hash of the file content."""
-        sha256_hash = hashlib.sha256()
+        """Computes a content hash of the file (xxh3 / BLAKE3 / SHA256, see _new_file_hasher)."""
+        file_hash = _new_file_hasher()
         try:
-            with open(file_path, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
-            return sha256_hash.hexdigest()
+            with open(file_path, "rb", buffering=0) as f:
+                if os.fstat(f.fileno()).st_size > Config.HASH_CHUNK:
+                    # Large file: hash the mapping directly, no read copies
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                            mm.madvise(mmap.MADV_SEQUENTIAL)
+                        file_hash.update(mm)
+                    return file_hash.hexdigest()
+                # Small file: usually a single read
+                for byte_block in iter(lambda: f.read(Config.HASH_CHUNK), b""):
+                    file_hash.update(byte_block)
+            return file_hash.hexdigest()
         except Exception as e:
             print(f"Error hashing file {file_path}: {e}")
             return None
 
+    def hash_and_text(self, file_path):
+        """
+        Content hash and extracted text from a single open + mmap of the file.
+        text is None for formats with their own parser (PDF/DOCX): use extract_text.
+        Returns (None, None) if the file can't be read.
+        """
+        if os.path.splitext(file_path)[1].lower() not in _TEXT_EXTENSIONS:
+            return self.compute_file_hash(file_path), None
+        
+        file_hash = _new_file_hasher()
+        try:
+            with open(file_path, "rb", buffering=0) as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return file_hash.hexdigest(), ""
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    file_hash.update(mm)
+                    text = self._decode_text_prefix(mm, size)
+            return file_hash.hexdigest(), text
+        except Exception as e:
+            print(f"Error reading file {file_path}: {e}")
+            return None, None
+
     def extract_text(self, file_path):
         """Extracts text from PDF, TXT, or DOCX files."""
         text = ""
         try:
             ext = os.path.splitext(file_path)[1].lower()
             # Basic text reading
-            if ext in ['.txt', '.md', '.log', '.csv', '.py', '.js', '.html']:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    text = f.read(Config.MAX_TEXT_LENGTH)
+            if ext in _TEXT_EXTENSIONS:
+                text = self._read_text_prefix(file_path)
             elif ext == '.pdf':
-                doc = fitz.open(file_path)
-                for page in doc:
-                    text += page.get_text()
-                    if len(text) > Config.MAX_TEXT_LENGTH:
-                        break
-                text = text[:Config.MAX_TEXT_LENGTH]
-                doc.close()
+                with fitz.open(file_path) as doc:
+                    # Pages are only parsed until enough text is collected
+                    text = self._join_capped(page.get_text(flags=_PDF_TEXT_FLAGS) for page in doc)
             elif ext in ['.docx', '.doc']:
                 # Extract from Word documents
+                if docx is None:
+                    print("python-docx not installed, skipping .docx file")
+                    return None
                 try:
-                    import docx
                     doc = docx.Document(file_path)
-                    for para in doc.paragraphs:
-                        text += para.text + "\n"
-                        if len(text) > Config.MAX_TEXT_LENGTH:
-                            break
-                    text = text[:Config.MAX_TEXT_LENGTH]
-                except ImportError:
-                    print("python-docx not installed, skipping .docx file")
+                    text = self._join_capped(para.text + "\n" for para in doc.paragraphs)
                 except Exception as e:
                     print(f"Error reading .docx file: {e}")
         except Exception as e:
@@ -59,30 +166,87 @@ class EmbeddingEngine:
             return None
         return text
 
+    def _join_capped(self, parts):
+        """Joins text parts (pulled lazily) until MAX_TEXT_LENGTH characters are collected"""
+        collected = []
+        total = 0
+        for part in parts:
+            collected.append(part)
+            total += len(part)
+            if total >= Config.MAX_TEXT_LENGTH:
+                break
+        return ''.join(collected)[:Config.MAX_TEXT_LENGTH]
+
+    def _read_text_prefix(self, file_path):
+        """
+        First MAX_TEXT_LENGTH characters of a UTF-8 text file, decoded straight
+        from a read-only mapping (no buffered-IO copies, no more than we need).
+        """
+        with open(file_path, 'rb', buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return ""
+            # UTF-8 is at most 4 bytes per character
+            length = min(size, Config.MAX_TEXT_LENGTH * 4)
+            with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ) as mm:
+                return self._decode_text_prefix(mm, size)
+
+    def _decode_text_prefix(self, mm, size):
+        """First MAX_TEXT_LENGTH characters of the UTF-8 text in mapping mm"""
+        # UTF-8 is at most 4 bytes per character
+        text = mm[:min(size, Config.MAX_TEXT_LENGTH * 4)].decode('utf-8', errors='ignore')
+        # Match text-mode reads: universal newlines
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text[:Config.MAX_TEXT_LENGTH]
+
     def generate_embedding(self, text):
         """Generates semantic embedding using neural sentence transformer."""
         if not text or len(text.strip()) == 0:
             return None
+        return self.generate_embeddings_batch([text])[0]
+
+    def generate_embeddings_batch(self, texts):
+        """
+        Embeds many texts in batched forward passes.
+        Returns a list aligned with texts; entries are None for empty texts or on failure.
+        """
+        results = [None] * len(texts)
+        # Clean and preprocess text for better embeddings
+        cleaned = [(i, self._preprocess_text(t)) for i, t in enumerate(texts) if t and t.strip()]
+        cleaned = [(i, t) for i, t in cleaned if t]
+        if not cleaned:
+            return results
         
         try:
-            # Clean and preprocess text for better embeddings
-            cleaned_text = self._preprocess_text(text)
-            
-            # Generate embedding using neural network
-            embedding = self.model.encode(cleaned_text, convert_to_numpy=True)
-            return embedding
+            with torch.inference_mode():
+                embeddings = self.model.encode(
+                    [t for _, t in cleaned],
+                    batch_size=Config.EMBED_BATCH,
+                    convert_to_numpy=True,
+                    show_progress_bar=False,
+                    normalize_embeddings=True
+                )
         except Exception as e:
-            print(f"Error generating embedding: {e}")
-            return None
+            print(f"Error generating embeddings: {e}")
+            return results
+        
+        # Computation stays float32 (UMAP and HDBSCAN consume it natively); DB blobs
+        # are downcast to EMBEDDING_STORE_DTYPE by encode_embedding
+        embeddings = embeddings.astype(np.float32, copy=False)
+        for (i, _), emb in zip(cleaned, embeddings):
+            results[i] = emb
+        return results
     
     def _preprocess_text(self, text):
         """Clean and preprocess text for better semantic embeddings"""
-        # Remove excessive whitespace
-        text = ' '.join(text.split())
-        
         # Remove special characters but keep punctuation for context
-        import re
-        text = re.sub(r'[^\w\s\.\,\!\?\-]', ' ', text)
+        if text.isascii():
+            text = text.translate(_ASCII_CLEAN)
+        else:
+            text = _CLEAN_RE.sub(' ', text)
+        
+        # Remove excessive whitespace
+        text = _WS_RE.sub(' ', text)
         
         # Limit length while keeping complete sentences
         if len(text) > Config.MAX_TEXT_LENGTH:
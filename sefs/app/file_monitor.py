@@ -1,43 +1,97 @@
+import os
+import threading
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import (FileSystemEventHandler, FileCreatedEvent, FileDeletedEvent,
+                             FileModifiedEvent, FileMovedEvent)
 import time
 from .config import Config
 
+# The only event kinds we handle; open/close/access events are dropped by the emitter
+_EVENT_FILTER = [FileCreatedEvent, FileDeletedEvent, FileModifiedEvent, FileMovedEvent]
+
 class SEFSEventHandler(FileSystemEventHandler):
-    def __init__(self, callback):
+    _EXT_SET = Config.EXTENSION_SET  # one class-level lookup per event
+
+    def __init__(self, callback, root=None):
         self.callback = callback
+        # With a root, events under dot-directories below it (.git, .gemini...) are dropped
+        self._root = os.path.join(os.path.normpath(root), '') if root else None
         self.last_events = {}
         self.debounce_seconds = 1.0
+        # Paths SEFS itself just moved files from/to: {path: expiry}, see ignore_paths
+        self._ignored = {}
+        self._ignored_lock = threading.Lock()
+
+    def ignore_paths(self, paths, seconds=None):
+        """Drop events for these paths for a while (our own moves, not user changes)"""
+        now = time.monotonic()
+        expiry = now + (seconds or Config.SELF_MOVE_IGNORE_SEC)
+        with self._ignored_lock:
+            # Most moved-from paths never see another event, so expire entries here too
+            self._ignored = {p: e for p, e in self._ignored.items() if e >= now}
+            for path in paths:
+                self._ignored[os.path.normpath(path)] = expiry
+
+    def _is_ignored(self, path):
+        if not self._ignored:
+            return False
+        now = time.monotonic()
+        with self._ignored_lock:
+            expiry = self._ignored.get(os.path.normpath(path))
+            if expiry is None:
+                return False
+            if expiry < now:
+                del self._ignored[os.path.normpath(path)]
+                return False
+            return True
 
     def on_moved(self, event):
         if event.is_directory:
             return
+        if self._is_ignored(event.dest_path):
+            return
         if self._is_valid_file(event.dest_path):
             self._trigger('moved', event.dest_path)
 
     def on_created(self, event):
-        if event.is_directory:
+        if event.is_directory or self._is_ignored(event.src_path):
             return
         if self._is_valid_file(event.src_path):
             self._trigger('created', event.src_path)
 
     def on_deleted(self, event):
-        if event.is_directory:
+        if event.is_directory or self._is_ignored(event.src_path):
             return
         # We might want to know if a tracked file was deleted
-        self._trigger('deleted', event.src_path)
+        if self._has_valid_extension(event.src_path) and not self._in_hidden_dir(event.src_path):
+            self._trigger('deleted', event.src_path)
 
     def on_modified(self, event):
-        if event.is_directory:
+        if event.is_directory or self._is_ignored(event.src_path):
             return
         if self._is_valid_file(event.src_path):
             self._trigger('modified', event.src_path)
 
+    def _has_valid_extension(self, path):
+        return os.path.splitext(path)[1].lower() in self._EXT_SET
+
+    def _in_hidden_dir(self, path):
+        """True for paths inside a dot-directory below the root, which the startup scan skips too"""
+        if self._root is None:
+            return False
+        path = os.path.normpath(path)
+        if not path.startswith(self._root):
+            return False
+        return (os.sep + '.') in (os.sep + os.path.dirname(path[len(self._root):]))
+
     def _is_valid_file(self, path):
-        import os
+        # Unsupported types never reach the worker
+        if not self._has_valid_extension(path):
+            return False
+        
         # Ignore hidden files or temporary system files
         filename = os.path.basename(path)
-        if filename.startswith('.'):
+        if filename.startswith('.') or self._in_hidden_dir(path):
             return False
         if filename.endswith('.tmp') or filename.endswith('.crdownload'): 
             return False
@@ -51,8 +105,10 @@ class SEFSEventHandler(FileSystemEventHandler):
         # Also ignore the DB file itself!
         if 'sefs.db' in filename:
             return False
-            
-        return os.path.isfile(path)
+        
+        # Directory events are dropped by the on_* handlers, so no isfile() stat here;
+        # the worker's os.stat in Worker.process_files_batch catches files that are already gone
+        return True
 
     def _trigger(self, event_type, path):
         # Simple debounce
@@ -70,10 +126,21 @@ class FileMonitor:
         self.path = path
         self.callback = callback
         self.observer = Observer()
-        self.handler = SEFSEventHandler(callback)
+        self.handler = SEFSEventHandler(callback, root=path)
+
+    def ignore_paths(self, paths):
+        """Suppress the events our own file moves are about to produce"""
+        self.handler.ignore_paths(paths)
 
     def start(self):
-        self.observer.schedule(self.handler, self.path, recursive=True)
+        # Recursive on purpose: organized files live in cluster subfolders and user
+        # edits there must still be seen. Our own moves are muted via ignore_paths.
+        try:
+            self.observer.schedule(self.handler, self.path, recursive=True,
+                                   event_filter=_EVENT_FILTER)
+        except TypeError:
+            # watchdog < 4 has no event_filter; the handler ignores other kinds anyway
+            self.observer.schedule(self.handler, self.path, recursive=True)
         self.observer.start()
 
     def stop(self):
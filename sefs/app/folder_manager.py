@@ -1,4 +1,5 @@
 import os
+import errno
 import shutil
 import time
 
@@ -8,34 +9,39 @@ class FolderManager:
     Now supports dynamic folder generation based on extension.
     """
 
+    _EXT_TO_TYPE = {
+        '.pdf': "PDF_Documents",
+        '.txt': "Text_Files",
+        **dict.fromkeys(['.doc', '.docx'], "Word_Documents"),
+        **dict.fromkeys(['.md', '.log'], "Documentation"),
+        **dict.fromkeys(['.jpg', '.jpeg', '.png', '.gif', '.bmp'], "Image_Files"),
+        **dict.fromkeys(['.mp3', '.wav', '.flac'], "Audio_Files"),
+        **dict.fromkeys(['.mp4', '.mkv', '.avi', '.mov'], "Video_Files"),
+        **dict.fromkeys(['.py', '.js', '.html', '.css', '.java', '.cpp', '.c', '.h', '.json', '.xml'], "Source_Code"),
+        **dict.fromkeys(['.zip', '.rar', '.7z', '.tar', '.gz'], "Archives"),
+    }
+
+    def __init__(self):
+        self._known_dirs = set()  # target dirs already created/seen, skips a stat per move
     
     def _get_type_folder_name(self, extension):
         # Maps extension to a high-level Type Folder
         if not extension:
             return "Misc_Files"
-            
+        
         ext = extension.lower()
-        if ext == '.pdf':
-            return "PDF_Documents"
-        elif ext == '.txt':
-            return "Text_Files"
-        elif ext in ['.doc', '.docx']:
-            return "Word_Documents"
-        elif ext in ['.md', '.log']:
-            return "Documentation"
-        elif ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp']:
-            return "Image_Files"
-        elif ext in ['.mp3', '.wav', '.flac']:
-             return "Audio_Files"
-        elif ext in ['.mp4', '.mkv', '.avi', '.mov']:
-             return "Video_Files"
-        elif ext in ['.py', '.js', '.html', '.css', '.java', '.cpp', '.c', '.h', '.json', '.xml']:
-             return "Source_Code"
-        elif ext in ['.zip', '.rar', '.7z', '.tar', '.gz']:
-             return "Archives"
-        else:
-             # Fallback: Just use the extension name
-             return f"{ext.lstrip('.').upper()}_Files"
+        folder = self._EXT_TO_TYPE.get(ext)
+        if folder is None:
+            # Fallback: Just use the extension name
+            folder = f"{ext.lstrip('.').upper()}_Files"
+        return folder
+
+    def _same_path(self, a, b):
+        if not os.path.isabs(a):
+            a = os.path.abspath(a)
+        if not os.path.isabs(b):
+            b = os.path.abspath(b)
+        return os.path.normcase(a) == os.path.normcase(b)
 
     def _get_cluster_folder_name(self, cluster_id):
         # Semantic ID based naming
@@ -43,6 +49,12 @@ class FolderManager:
             return "Unclassified_Noise"
         return f"Semantic_Cluster_{cluster_id}"
 
+    def is_organized(self, file_path, folder_name, root_path):
+        """True when file_path already sits in Root / folder_name / Type_Folder (no disk access)"""
+        ext = os.path.splitext(file_path)[1].lower()
+        target_dir = os.path.join(os.path.normpath(root_path), folder_name, self._get_type_folder_name(ext))
+        return self._same_path(os.path.dirname(os.path.normpath(file_path)), target_dir)
+
     def move_file(self, file_path, folder_name, root_path):
         """
         Moves file to: Root / Cluster_Folder / Type_Folder / File
@@ -68,31 +80,46 @@ class FolderManager:
         target_dir = os.path.join(root_path, cluster_folder, type_folder)
         
         # Ensure target folder exists
-        if not os.path.exists(target_dir):
+        if target_dir not in self._known_dirs:
             try:
-                os.makedirs(target_dir)
+                os.makedirs(target_dir, exist_ok=True)
+                self._known_dirs.add(target_dir)
             except OSError:
                 pass
 
         filename = os.path.basename(file_path)
         destination_path = os.path.join(target_dir, filename)
         
-        # Check if already there
-        if os.path.abspath(file_path) == os.path.abspath(destination_path):
+        # Check if already there. Both paths are normpath'd; abspath (a getcwd()
+        # each) only matters for relative input, which the worker never passes.
+        if self._same_path(file_path, destination_path):
             return file_path
 
-        # Handle name collision - replace existing file
-        if os.path.exists(destination_path):
-            try:
-                os.remove(destination_path)
-                print(f"DEBUG: Replaced existing file at {destination_path}")
-            except Exception as e:
-                print(f"Warning: Could not remove old file: {e}")
-                base, ext = os.path.splitext(filename)
-                timestamp = int(time.time())
-                new_filename = f"{base}_{timestamp}{ext}"
-                destination_path = os.path.join(target_dir, new_filename)
+        # os.replace is a single rename that also overwrites an existing file at
+        # the destination (name collision) atomically
+        try:
+            os.replace(file_path, destination_path)
+            return destination_path
+        except OSError as e:
+            if isinstance(e, FileNotFoundError) and target_dir in self._known_dirs \
+                    and not os.path.isdir(target_dir):
+                # Folder was deleted behind our back: forget it and recreate
+                self._known_dirs.discard(target_dir)
+                return self.move_file(file_path, folder_name, root_path)
+            if e.errno == errno.EXDEV:
+                # Different filesystem: needs copy + delete
+                return self._shutil_move(file_path, destination_path)
+            if not os.path.exists(destination_path):
+                print(f"Error moving file {file_path}: {e}")
+                return None
+            # Existing file can't be replaced (e.g. locked): keep both
+            print(f"Warning: Could not replace old file: {e}")
+            base, ext = os.path.splitext(filename)
+            timestamp = int(time.time())
+            destination_path = os.path.join(target_dir, f"{base}_{timestamp}{ext}")
+            return self._shutil_move(file_path, destination_path)
 
+    def _shutil_move(self, file_path, destination_path):
         try:
             shutil.move(file_path, destination_path)
             return destination_path
@@ -1,15 +1,18 @@
 import sys
 import os
 import queue
+import threading
 import time
 import datetime
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from PyQt6.QtCore import QThread, pyqtSignal, QObject
 from PyQt6.QtWidgets import QApplication
 
 from .config import Config
 from .database import DatabaseManager
-from .embedding_engine import EmbeddingEngine
-from .clustering_engine import ClusteringEngine
+from .embedding_engine import EmbeddingEngine, FILE_HASH_ALGORITHM, encode_embedding, decode_embeddings
+from .clustering_engine import ClusteringProcess
 from .folder_manager import FolderManager
 from .file_monitor import FileMonitor
 from .ui.main_window import MainWindow
@@ -22,6 +25,7 @@ load_dotenv()
 class Worker(QThread):
     log_signal = pyqtSignal(str)
     update_graph_signal = pyqtSignal(object, object, object) # files_data, reduced_coords, cluster_names
+    update_graph_delta_signal = pyqtSignal(object, object, object) # added, moved, removed_paths
 
     def __init__(self, root_path):
         super().__init__()
@@ -32,14 +36,43 @@ class Worker(QThread):
         # Initialize Backend Components
         self.db = DatabaseManager()
         
-        # Clear database on startup for fresh state
-        print("Clearing database for fresh start...")
-        self.db.clear_all()
+        # Embeddings persist across restarts (the startup scan skips unchanged files);
+        # they are only wiped when the model, on-disk format or file-hash digest changes
+        embedding_format = f"{Config.EMBEDDING_MODEL_NAME}/{Config.EMBEDDING_STORE_DTYPE}/{FILE_HASH_ALGORITHM}"
+        if self.db.get_meta('embedding_format') != embedding_format:
+            print("Embedding model or format changed, clearing stored embeddings...")
+            self.db.clear_all()
+            # The cached UMAP fit is keyed by file hashes, which survive a model change
+            if os.path.exists(Config.UMAP_CACHE_PATH):
+                os.remove(Config.UMAP_CACHE_PATH)
+            self.db.set_meta('embedding_format', embedding_format)
         
         self.embedder = EmbeddingEngine()
-        self.clusterer = ClusteringEngine()
+        self.clusterer = ClusteringProcess()  # UMAP/HDBSCAN run in a child process
         self.folder_manager = FolderManager()
-        self.ai_namer = AINamer()  # Initialize AI naming service
+        self.ai_namer = AINamer(self.db)  # Initialize AI naming service (names persist in DB)
+        
+        # Last full clustering, reused for incremental passes
+        self._cluster_names = None  # {cluster_id: folder_name}
+        self._dirty_since_full = 0  # files assigned incrementally since that pass
+        self._full_noise_fraction = 0.0  # share of noise (-1) files right after that pass
+        
+        self._emb_cache = {}  # {file_hash: float32 embedding}, see _load_embeddings
+        self._graph_state = None  # {file id: (path, cluster_id, content_sample, size)} last sent to the UI
+        
+        # Re-embedded paths waiting for the next (debounced) recluster
+        self._pending_dirty = set()
+        self._dirty_since = None  # monotonic time the oldest pending change arrived
+        self._last_event_ts = 0.0
+        
+        # Embedding rows are written by a dedicated thread (see _db_writer)
+        self.db_queue = queue.Queue()
+        self._db_thread = threading.Thread(target=self._db_writer, name="sefs-db-writer", daemon=True)
+        # Hashes changed files in parallel (see process_files_batch)
+        self._hash_pool = ThreadPoolExecutor(max_workers=Config.HASH_WORKERS, thread_name_prefix="sefs-hash")
+        # Runs batched encodes so extraction of the next batch overlaps the forward pass;
+        # a single thread keeps every model call on one thread
+        self._embed_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sefs-embed")
         
         # Monitor
         self.monitor = FileMonitor(self.root_path, self.handle_file_event)
@@ -49,6 +82,7 @@ class Worker(QThread):
 
     def run(self):
         self.log_signal.emit("Initializing engines...")
+        self._db_thread.start()
         self.monitor.start()
         self.log_signal.emit(f"Monitoring started on {self.root_path}")
         
@@ -58,260 +92,543 @@ class Worker(QThread):
         while self._is_running:
             try:
                 # Process events with a timeout to allow checking _is_running
-                event = self.event_queue.get(timeout=1.0)
-                event_type, path = event
-                self.process_event(event_type, path)
-                self.event_queue.task_done()
+                # (and, while a recluster is pending, whether it's due)
+                event = self.event_queue.get(timeout=0.25 if self._pending_dirty else 1.0)
             except queue.Empty:
+                self._maybe_recluster()
                 continue
+            
+            # Pick up the rest of the burst so it shares one encode
+            events = [event] + self._drain_events(Config.EVENT_DEBOUNCE_SEC, Config.EVENT_BATCH_MAX_SEC)
+            self._last_event_ts = time.monotonic()
+            try:
+                self.process_events(events)
             except Exception as e:
                 self.log_signal.emit(f"Error in worker loop: {e}")
+            finally:
+                for _ in events:
+                    self.event_queue.task_done()
+            self._maybe_recluster()
+
+    def _maybe_recluster(self):
+        """
+        Runs the deferred recluster once events have been quiet for RECLUSTER_QUIET_SEC,
+        or RECLUSTER_MAX_DELAY_SEC after the first pending change so a steady stream
+        still updates periodically. One pass then serves every burst since the last one.
+        """
+        if not self._pending_dirty:
+            return
+        now = time.monotonic()
+        if (now - self._last_event_ts < Config.RECLUSTER_QUIET_SEC
+                and now - self._dirty_since < Config.RECLUSTER_MAX_DELAY_SEC):
+            return
+        dirty, self._pending_dirty, self._dirty_since = self._pending_dirty, set(), None
+        try:
+            self.recluster_and_update(dirty=dirty)
+        except Exception as e:
+            self.log_signal.emit(f"Error in worker loop: {e}")
+
+    def _drain_events(self, quiet, max_wait):
+        """
+        Collect follow-up events until none arrives for `quiet` seconds,
+        or `max_wait` seconds have passed so a steady stream can't stall us.
+        """
+        events = []
+        deadline = time.monotonic() + max_wait
+        while self._is_running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                events.append(self.event_queue.get(timeout=min(quiet, remaining)))
+            except queue.Empty:
+                break
+        return events
 
     def stop(self):
         self._is_running = False
         self.monitor.stop()
         self.wait()
+        self._hash_pool.shutdown(wait=True)
+        self._embed_pool.shutdown(wait=True)
+        self.clusterer.close()
+        if self._db_thread.is_alive():
+            self.db_queue.put(None)
+            self._db_thread.join()
+
+    def _db_writer(self):
+        """
+        Writes queued embedding rows on its own thread/connection so SQLite commits
+        never stall hashing/encoding. Everything queued meanwhile goes in one transaction.
+        """
+        while True:
+            batches = [self.db_queue.get()]
+            while True:
+                try:
+                    batches.append(self.db_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                rows = [row for batch in batches if batch for row in batch]
+                if rows:
+                    with self.db.transaction():
+                        self.db.upsert_files_bulk(rows)
+                    print(f"DEBUG: Saved {len(rows)} embeddings + content samples")
+            except Exception as e:
+                self.log_signal.emit(f"Error writing to database: {e}")
+            finally:
+                for _ in batches:
+                    self.db_queue.task_done()
+            if None in batches:
+                break
+
+    def _flush_db(self):
+        """Block until every queued row is written; call before reading the files table"""
+        if self._db_thread.is_alive():
+            self.db_queue.join()
 
     def scan_existing_files(self):
         self.log_signal.emit("Scanning directory...")
-        valid_files = []
         
         # Recursive scan to find all supported files
-        for root, dirs, files in os.walk(self.root_path):
-            # Skip the .gemini or other hidden folders often ignored
-            if '.gemini' in root or '.git' in root:
-                continue
-                
-            for file in files:
-                # Skip hidden/system files
-                if file.startswith('.') or file.endswith('.tmp') or 'sefs.db' in file:
-                    continue
-                
-                # Check extension
-                ext = os.path.splitext(file)[1].lower()
-                if ext in Config.EXTENSIONS:
-                    file_path = os.path.normpath(os.path.join(root, file))
-                    valid_files.append(file_path)
+        valid_files = list(self._iter_supported_files(self.root_path))
         
         print(f"DEBUG: Found {len(valid_files)} total files in directory")
         
-        for file_path in valid_files:
-            self.process_file(file_path)
+        self.process_files_batch(valid_files)
         
         # Clean up DB entries for files that no longer exist
-        self._cleanup_missing_files()
+        self._cleanup_missing_files(present=set(valid_files))
         
         # First clustering
         self.recluster_and_update()
     
-    def _cleanup_missing_files(self):
-        """Remove DB entries for files that no longer exist"""
-        rows = self.db.get_all_files()
-        removed = 0
-        for row in rows:
-            file_path = os.path.normpath(row[1])
-            if not os.path.exists(file_path):
-                self.db.remove_file(file_path)
-                removed += 1
-        if removed > 0:
-            print(f"DEBUG: Cleaned up {removed} missing file entries from DB")
-
-    def process_event(self, event_type, path):
+    def _iter_supported_files(self, root_path):
+        """
+        Yields normalized paths of supported files under root_path.
+        os.scandir DirEntry types come from the directory listing, so no per-entry stat.
+        """
+        stack = [root_path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        # Skip hidden/system files, and .git, .gemini etc. entirely.
+                        # Cluster folders are still walked: files may have been added
+                        # or edited there while SEFS was not running.
+                        name = entry.name
+                        if name.startswith('.'):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif name.endswith('.tmp') or 'sefs.db' in name:
+                            continue
+                        elif os.path.splitext(name)[1].lower() in Config.EXTENSION_SET and entry.is_file():
+                            yield os.path.normpath(entry.path)
+            except OSError as e:
+                print(f"DEBUG: Cannot scan directory: {e}")
+
+    def _cleanup_missing_files(self, present=None):
+        """
+        Remove DB entries for files that no longer exist.
+        present: paths a scan just found; membership replaces a stat per tracked file.
+        """
+        self._flush_db()
+        if present is not None:
+            missing = [p for p in self.db.get_all_paths() if os.path.normpath(p) not in present]
+        else:
+            missing = [p for p in self.db.get_all_paths() if not os.path.exists(p)]
+        self.db.remove_files(missing)
+        if missing:
+            print(f"DEBUG: Cleaned up {len(missing)} missing file entries from DB")
+
+    def process_events(self, events):
+        """Handle a burst of events: embed changed files in one batch and mark them for reclustering"""
+        # One event per path. Several events for a path (editor save = delete+create,
+        # create+modify...) mean its content may have changed: treat as 'modified'
+        # unless the burst ended with it deleted.
+        latest = {}
+        for event_type, path in events:
+            path = os.path.normpath(path)
+            if path in latest and event_type != "deleted":
+                event_type = "modified"
+            latest[path] = event_type
+        
+        to_process = []
+        deleted = []
+        for path, event_type in latest.items():
+            path = self.process_event(event_type, path, deleted)
+            if path:
+                to_process.append(path)
+        # One DELETE for every file removed in the burst
+        self.db.remove_files(deleted)
+        
+        dirty = self.process_files_batch(to_process)
+        if dirty:
+            # Reclustering is deferred and coalesced across bursts, see _maybe_recluster
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+            self._pending_dirty |= dirty
+
+    def process_event(self, event_type, path, deleted=None):
+        """
+        Filters one event. Returns the path if its file needs (re)processing, else None.
+        deleted: optional list collecting removed paths for one bulk delete by the caller.
+        """
         path = os.path.normpath(path)
         
         # Check if file extension is supported
         ext = os.path.splitext(path)[1].lower()
-        if ext not in Config.EXTENSIONS:
-            return
+        if ext not in Config.EXTENSION_SET:
+            return None
         
         # For 'created' or 'moved', check if this is an AI organization move
         # We can detect this by seeing if the file is already in a sub-subfolder (Cluster/Type/File)
         # and its content hash is already in the database with that path.
         if event_type in ["created", "moved"]:
-            existing = self.db.get_file(path)
-            if existing:
+            if self.db.get_file_hash(path) is not None:
                 # File already exists at this path in DB, likely moved there by us
                 # or just a redundant OS event. Skip to prevent loop.
-                return
+                return None
 
         self.log_signal.emit(f"Event: {event_type} - {os.path.basename(path)}")
         
-        if event_type in ["created", "moved"]:
-            # Add small delay to ensure file write is complete
-            time.sleep(0.5)
-            if os.path.exists(path):
-                self.process_file(path)
-                self.recluster_and_update()
-        elif event_type == "modified":
-            # Check if file content actually changed
-            existing = self.db.get_file(path)
-            if existing:
-                new_hash = self.embedder.compute_file_hash(path)
-                if new_hash == existing[2]:
-                    return
-            
+        if event_type in ["created", "moved", "modified"]:
+            # No settle delay needed: run() only gets here after EVENT_DEBOUNCE_SEC of quiet.
+            # Whether content actually changed is decided by process_files_batch's fingerprint check
             if os.path.exists(path):
-                self.process_file(path)
-                self.recluster_and_update()
+                return path
         elif event_type == "deleted":
             # Just remove from DB, don't recluster immediately to avoid noise
-            self.db.remove_file(path)
+            if deleted is None:
+                self.db.remove_file(path)
+            else:
+                deleted.append(path)
+        return None
 
     def process_file(self, file_path):
-        # Normalize path
-        file_path = os.path.normpath(file_path)
-        print(f"DEBUG: Processing {file_path}")
-        
-        if not os.path.exists(file_path):
-            print(f"DEBUG: File not found {file_path}")
-            return
+        """Hash, extract, embed and store a single file"""
+        self.process_files_batch([file_path])
 
-        # 1. Compute Hash
-        file_hash = self.embedder.compute_file_hash(file_path)
-        if not file_hash:
-            print(f"DEBUG: Hash failed for {file_path}")
-            return
-
-        # 2. Check DB
-        existing = self.db.get_file(file_path)
+    def process_files_batch(self, paths):
+        """
+        Hash, extract, embed and store many files. Returns the set of paths whose
+        embedding was (re)written.
         
-        if existing and existing[2] == file_hash:
-            print(f"DEBUG: File already processed (hash match) {file_path}")
-            return
+        One query fetches every stored fingerprint; files with unchanged size + mtime
+        are skipped without hashing; changed files are hashed on a thread pool while
+        this thread extracts them, and each EMBED_BATCH is encoded on the embed thread
+        while the next one is being extracted.
+        """
+        paths = [os.path.normpath(p) for p in paths]
+        stored = self.db.get_fingerprints(paths)  # {path: (hash, size, mtime_ns)}
         
-        # 3. Extract text and generate embedding
-        self.log_signal.emit(f"Processing: {os.path.basename(file_path)}")
-        print(f"DEBUG: Generating embedding for {file_path}")
+        # 1. Same size + mtime as when we stored it: unchanged, skip the hash entirely
+        changed = []
+        for file_path in paths:
+            print(f"DEBUG: Processing {file_path}")
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                print(f"DEBUG: File not found {file_path}")
+                continue
+            fingerprint = stored.get(file_path)
+            if fingerprint and fingerprint[1] == st.st_size and fingerprint[2] == st.st_mtime_ns:
+                print(f"DEBUG: File unchanged (size+mtime match) {file_path}")
+                continue
+            changed.append((file_path, st))
+        changed = self._drop_unstable(changed)
         
-        text_content = self.embedder.extract_text(file_path)
+        dirty = set()
+        refreshed = []  # (path, size, mtime_ns) of touched-but-identical files
+        pending = []  # (path, hash, text, size, mtime_ns) awaiting one batched encode
+        encodes = []  # futures of submitted batches
         
-        if text_content and len(text_content.strip()) > 10:
-            # Generate embedding
-            emb = self.embedder.generate_embedding(text_content)
+        # 2. Hash on the pool (hashlib releases the GIL). Plain-text files are also
+        #    decoded there from the same mmap; PDF/DOCX extraction stays on this
+        #    thread, PyMuPDF isn't thread-safe.
+        results = self._hash_pool.map(self.embedder.hash_and_text, [p for p, _ in changed])
+        for (file_path, st), (file_hash, text) in zip(changed, results):
+            if not file_hash:
+                print(f"DEBUG: Hash failed for {file_path}")
+                continue
             
-            if emb is not None:
-                # Store first 500 chars as content sample for AI naming
-                content_sample = text_content[:500]
-                
-                # Save to DB with content sample
-                self.db.upsert_file(
-                    file_path, 
-                    file_hash, 
-                    emb.tobytes(), 
-                    datetime.datetime.now(),
-                    content_sample
-                )
-                print(f"DEBUG: Saved embedding + content sample for {file_path}")
-            else:
+            # 3. Check DB
+            fingerprint = stored.get(file_path)
+            if fingerprint and fingerprint[0] == file_hash:
+                print(f"DEBUG: File already processed (hash match) {file_path}")
+                # Touched but not changed: remember the new stat so the next check is free
+                refreshed.append((file_path, st.st_size, st.st_mtime_ns))
+                continue
+            
+            # 4. Extract text
+            self.log_signal.emit(f"Processing: {os.path.basename(file_path)}")
+            text_content = text if text is not None else self.embedder.extract_text(file_path)
+            if not text_content or len(text_content.strip()) <= 10:
+                print(f"DEBUG: No text content extracted from {file_path}")
+                continue
+            
+            pending.append((file_path, file_hash, text_content, st.st_size, st.st_mtime_ns))
+            if len(pending) >= Config.EMBED_BATCH:
+                # 5. Encode in the background (torch releases the GIL) and keep extracting
+                encodes.append(self._embed_pool.submit(self._embed_and_store, pending))
+                pending = []
+        
+        if pending:
+            encodes.append(self._embed_pool.submit(self._embed_and_store, pending))
+        self.db.update_fingerprints_bulk(refreshed)
+        for encode in encodes:
+            dirty |= encode.result()
+        return dirty
+
+    def _embed_and_store(self, pending):
+        """
+        Embed (path, hash, text, size, mtime_ns) tuples in one batched encode and queue
+        the rows for the DB writer. Returns the set of paths that were embedded.
+        """
+        print(f"DEBUG: Generating embeddings for {len(pending)} files")
+        embeddings = self.embedder.generate_embeddings_batch([p[2] for p in pending])
+        
+        rows = []
+        for (file_path, file_hash, text_content, size, mtime_ns), emb in zip(pending, embeddings):
+            if emb is None:
                 self.log_signal.emit(f"Failed to process {os.path.basename(file_path)}")
                 print(f"DEBUG: Embedding generation failed for {file_path}")
-        else:
-            print(f"DEBUG: No text content extracted from {file_path}")
+                continue
+            # Store first 500 chars as content sample for AI naming
+            rows.append((file_path, file_hash, encode_embedding(emb), datetime.datetime.now(),
+                         text_content[:500], size, mtime_ns))
+        
+        if rows:
+            self.db_queue.put(rows)
+        return {row[0] for row in rows}
 
-    def recluster_and_update(self):
+    def _drop_unstable(self, changed):
+        """
+        Size-stability probe for files written moments ago: one short sleep for the
+        whole batch, then files whose size or mtime moved are re-queued as 'modified'
+        (still being written) instead of hashing a partial file. Old files cost nothing.
+        """
+        cutoff = time.time_ns() - int(Config.STABLE_PROBE_SEC * 1e9)
+        if not any(st.st_mtime_ns > cutoff for _, st in changed):
+            return changed
+        
+        time.sleep(Config.STABLE_PROBE_INTERVAL)
+        stable = []
+        for file_path, st in changed:
+            if st.st_mtime_ns > cutoff:
+                try:
+                    now = os.stat(file_path)
+                except OSError:
+                    continue
+                if (now.st_size, now.st_mtime_ns) != (st.st_size, st.st_mtime_ns):
+                    print(f"DEBUG: Still being written, retrying later {file_path}")
+                    self.event_queue.put(("modified", file_path))
+                    continue
+            stable.append((file_path, st))
+        return stable
+
+    def recluster_and_update(self, dirty=None):
         """
         SEMANTIC CLUSTERING - Cluster ALL files together by content!
         1. Get all files regardless of extension
         2. Cluster ALL together using HDBSCAN + UMAP
         3. Generate AI names for semantic clusters
         4. Move files to Cluster/Type structure
-        """
-        import numpy as np
         
+        dirty: optional set of paths that changed since the last pass. When given (and
+        few enough), only those files are assigned to the existing clusters and moved.
+        """
         # 1. Get all files and group by type
-        rows = self.db.get_all_files()
-        if not rows:
-            return
-
-        # Collect ALL files with embeddings
-        all_files = []
-        all_embeddings = []
-        
-        for row in rows:
-            # row: id, path, hash, embedding_blob, cluster_id, last_mod, content_sample
-            if row[3] and len(row[3]) > 2:  # Has valid embedding
-                try:
-                    emb = np.frombuffer(row[3], dtype=np.float32)
-                    all_files.append(row)
-                    all_embeddings.append(emb)
-                except Exception as e:
-                    print(f"DEBUG: Error loading embedding: {e}")
+        self._flush_db()
+        # Collect ALL files with embeddings (metadata only, vectors come from the cache)
+        # sqlite3.Row: file_path, file_hash, embedding_size, cluster_id, content_sample, ...
+        valid = self.db.get_all_file_meta()
+        if valid:
+            blob_size = valid[0]['embedding_size']
+            all_files = [row for row in valid if row['embedding_size'] == blob_size]
+            if len(all_files) < len(valid):
+                print(f"DEBUG: Skipping {len(valid) - len(all_files)} embeddings of a different dimension")
+        else:
+            all_files = []
 
+        # One contiguous (N, D) float32 matrix for clustering, naming and the layout
+        all_files, all_embeddings = self._load_embeddings(all_files)
         if not all_files:
             print("DEBUG: No files with embeddings found")
             return
         
-        print(f"DEBUG: Clustering {len(all_files)} files SEMANTICALLY (all types together)")
-
-        # 2. Cluster ALL files together by semantic content
-        labels = self.clusterer.perform_clustering(all_embeddings)
-        n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
-        print(f"DEBUG: Found {n_clusters} semantic clusters across all file types")
+        labels = None
+        move_idx = None  # indices of files to (re)move; None = all
+        if dirty and self._cluster_names is not None:
+            move_idx = [i for i, row in enumerate(all_files) if os.path.normpath(row['file_path']) in dirty]
+            labels = self._assign_incremental(all_files, all_embeddings, move_idx)
         
-        # 3. Generate AI names for each semantic cluster
-        clusters = set(labels)
-        cluster_names = {}  # {cluster_id: "AI_Name"}
-        
-        for cluster_id in clusters:
-            # Get content samples from this cluster
-            content_samples = []
-            for i, lbl in enumerate(labels):
-                if lbl == cluster_id:
-                    row = all_files[i]
-                    if row[6]:  # content_sample
-                        content_samples.append(row[6])
-            
-            print(f"DEBUG: Generating AI name for cluster {cluster_id} with {len(content_samples)} files")
-            
-            # Generate AI name
-            ai_name = self.ai_namer.generate_folder_name(content_samples[:5], cluster_id)
-            cluster_names[cluster_id] = ai_name
-            print(f"DEBUG: Cluster {cluster_id} → '{ai_name}'")
+        if labels is not None:
+            cluster_names = self._cluster_names
+        else:
+            move_idx = None
+            labels, cluster_names = self._cluster_all(all_files, all_embeddings)
+            self._cluster_names = cluster_names
+            self._dirty_since_full = 0
+            self._full_noise_fraction = sum(1 for label in labels if label == -1) / len(labels)
         
         # 4. Move files to Cluster/Type structure
-        all_files_data = []
+        all_files_data = []  # {'path', 'cluster_id', 'content_sample'} per file, for the UI
+        cluster_updates = []  # (file_path, cluster_id), written in one transaction
+        moved_paths = []  # (old_path, new_path)
+        to_move = set(range(len(all_files))) if move_idx is None else set(move_idx)
         
-        for i, row in enumerate(all_files):
-            file_path = os.path.normpath(row[1])
-            new_cluster = int(labels[i])
-            folder_name = cluster_names.get(new_cluster, f"Semantic_Cluster_{new_cluster}")
-            
-            # Update cluster in DB
-            self.db.update_cluster(file_path, new_cluster)
-            
-            # Move file to Cluster/Type/file structure
-            new_path = self.folder_manager.move_file(file_path, folder_name, self.root_path)
-            
-            if new_path and new_path != file_path:
-                # File was moved - update DB path
-                self.db.remove_file(file_path)
-                self.db.upsert_file(
-                    new_path,
-                    row[2],  # hash
-                    row[3],  # embedding
-                    datetime.datetime.now(),
-                    row[6]   # content_sample
-                )
-                self.db.update_cluster(new_path, new_cluster)
-                self.log_signal.emit(f"→ {folder_name}/{os.path.basename(new_path)}")
+        with self.db.transaction():
+            for i, row in enumerate(all_files):
+                new_cluster = int(labels[i])
+                file_path = row['file_path']
+                if i in to_move:
+                    file_path = os.path.normpath(file_path)
+                    folder_name = cluster_names.get(new_cluster, f"Semantic_Cluster_{new_cluster}")
+                    if new_cluster == row['cluster_id'] and self.folder_manager.is_organized(file_path, folder_name, self.root_path):
+                        # Same cluster, already in its folder: no move, no DB write
+                        all_files_data.append({'id': row['id'], 'path': file_path, 'cluster_id': new_cluster,
+                                               'content_sample': row['content_sample'] or '', 'size': row['size']})
+                        continue
+                
+                    # Move file to Cluster/Type/file structure; mute the watcher on the source
+                    # first, the destination is only known afterwards (DB checks catch that race)
+                    self.monitor.ignore_paths([file_path])
+                    new_path = self.folder_manager.move_file(file_path, folder_name, self.root_path)
                 
-                # Update row for UI
-                row = list(row)
-                row[1] = new_path
-                row[4] = new_cluster
-                all_files[i] = tuple(row)
+                    if new_path and new_path != file_path:
+                        # File was moved - update DB path (a rename keeps size and mtime)
+                        moved_paths.append((file_path, new_path))
+                        self.monitor.ignore_paths([new_path])
+                        cluster_updates.append((new_path, new_cluster))
+                        self.log_signal.emit(f"→ {folder_name}/{os.path.basename(new_path)}")
+                        file_path = new_path
+                    else:
+                        cluster_updates.append((file_path, new_cluster))
             
-            # Prepare UI data
-            display_row = list(all_files[i])
-            display_row[4] = new_cluster
-            all_files_data.append(display_row)
+                # Prepare UI data
+                all_files_data.append({'id': row['id'], 'path': file_path, 'cluster_id': new_cluster,
+                                       'content_sample': row['content_sample'] or '', 'size': row['size']})
+        
+            self.db.rename_files(moved_paths)
+            self.db.update_clusters_bulk(cluster_updates)
+        
+        previous = self._graph_state
+        self._graph_state = {d['id']: (d['path'], d['cluster_id'], d['content_sample'], d['size'])
+                             for d in all_files_data}
+        
+        # Incremental passes keep the cluster names and layout: send the UI only what changed
+        if move_idx is not None and previous is not None:
+            added, moved, removed = self._graph_delta(previous, all_files_data)
+            if added or moved or removed:
+                self.update_graph_delta_signal.emit(added, moved, removed)
+            return
         
         # 5. Visualization
-        all_coords = self.clusterer.reduce_dimensions(all_embeddings)
+        all_coords = self.clusterer.reduce_dimensions(all_embeddings, keys=[row['file_hash'] for row in all_files])
         
         # 5. Update UI
         self.update_graph_signal.emit(all_files_data, all_coords, cluster_names)
 
+    def _graph_delta(self, previous, files_data):
+        """
+        Diffs files_data against the previous {id: (path, cluster_id, sample, size)} state.
+        Returns (added, moved, removed): new file dicts, changed file dicts (with
+        'old_path'), and paths of files that are gone.
+        """
+        added, moved = [], []
+        for d in files_data:
+            old = previous.get(d['id'])
+            if old is None:
+                added.append(d)
+            elif old != (d['path'], d['cluster_id'], d['content_sample'], d['size']):
+                moved.append(dict(d, old_path=old[0]))
+        removed = [old[0] for file_id, old in previous.items() if file_id not in self._graph_state]
+        return added, moved, removed
+
+    def _load_embeddings(self, files):
+        """
+        Stacks the embeddings of files (meta rows) into an (N, D) float32 matrix.
+        Vectors are cached by content hash across passes, so only new or changed files
+        are read from SQLite and decoded. Returns (files that have a vector, matrix).
+        """
+        hashes = [row['file_hash'] for row in files]
+        missing = {h for h in hashes if h not in self._emb_cache}
+        if missing:
+            blobs = self.db.get_embeddings(missing)
+            keys = list(blobs)
+            self._emb_cache.update(zip(keys, decode_embeddings([blobs[k] for k in keys])))
+        # Evict vectors of files that are gone or changed
+        for h in set(self._emb_cache).difference(hashes):
+            del self._emb_cache[h]
+        
+        files = [row for row in files if row['file_hash'] in self._emb_cache]
+        if not files:
+            return [], None
+        return files, np.stack([self._emb_cache[row['file_hash']] for row in files])
+
+    def _assign_incremental(self, all_files, all_embeddings, dirty_idx):
+        """
+        Labels for all files, with only dirty_idx re-assigned against the last full
+        clustering (the rest keep their stored cluster_id). None means recluster fully.
+        """
+        if not dirty_idx:
+            return None
+        # Too much drift since the last full pass: clusters may have split/merged
+        if self._dirty_since_full + len(dirty_idx) > Config.UMAP_REFIT_FRACTION * len(all_files):
+            return None
+        
+        new_labels = self.clusterer.assign_clusters(
+            all_embeddings[dirty_idx], [all_files[i]['file_hash'] for i in dirty_idx])
+        if new_labels is None:
+            return None
+        
+        labels = [row['cluster_id'] for row in all_files]
+        for i, label in zip(dirty_idx, new_labels):
+            labels[i] = int(label)
+        
+        # New files that fit no existing cluster pile up as noise; once noise has grown
+        # by NOISE_REFIT_FRACTION of the corpus, they probably form a new cluster
+        noise_fraction = labels.count(-1) / len(labels)
+        if noise_fraction - self._full_noise_fraction > Config.NOISE_REFIT_FRACTION:
+            print(f"DEBUG: Noise grew to {noise_fraction:.0%} since the last fit, reclustering")
+            return None
+        self._dirty_since_full += len(dirty_idx)
+        print(f"DEBUG: Incremental update of {len(dirty_idx)} files (no full recluster)")
+        return labels
+
+    def _cluster_all(self, all_files, all_embeddings):
+        """Full pass: cluster every file and name every cluster. Returns (labels, cluster_names)"""
+        print(f"DEBUG: Clustering {len(all_files)} files SEMANTICALLY (all types together)")
+
+        # 2. Cluster ALL files together by semantic content
+        # Adaptive min_cluster_size: bigger corpora get bigger (and fewer) clusters,
+        # which also keeps HDBSCAN's condensed tree small
+        min_cluster_size = max(Config.MIN_CLUSTER_SIZE, len(all_files) // Config.MIN_CLUSTER_SIZE_DIVISOR)
+        labels = self.clusterer.perform_clustering(
+            all_embeddings, keys=[row['file_hash'] for row in all_files],
+            min_cluster_size=min_cluster_size)
+        n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
+        print(f"DEBUG: Found {n_clusters} semantic clusters across all file types")
+        
+        # 3. Generate AI names for all semantic clusters in one batch,
+        #    from each cluster's most central members
+        cluster_summary = self.clusterer.summarize_clusters(all_embeddings, labels, top_k=5)
+        cluster_samples = {}  # {cluster_id: [content_sample, ...]}
+        cluster_centroids = {}  # {cluster_id: mean embedding} for the semantic name cache
+
+        for cluster_id, (centroid, top_idx) in cluster_summary.items():
+            content_samples = [all_files[i]['content_sample'] for i in top_idx if all_files[i]['content_sample']]
+            print(f"DEBUG: Collected {len(content_samples)} samples for cluster {cluster_id}")
+            cluster_samples[cluster_id] = content_samples
+            cluster_centroids[cluster_id] = centroid
+
+        cluster_names = self.ai_namer.generate_folder_names(cluster_samples, cluster_centroids)  # {cluster_id: "AI_Name"}
+        for cluster_id, ai_name in cluster_names.items():
+            print(f"DEBUG: Cluster {cluster_id} → '{ai_name}'")
+        return labels, cluster_names
+
 
 class SEFSService:
     def __init__(self):
@@ -324,6 +641,7 @@ class SEFSService:
         self.worker = Worker(root_path)
         self.worker.log_signal.connect(main_window.log_panel.add_log)
         self.worker.update_graph_signal.connect(main_window.update_graph_display)
+        self.worker.update_graph_delta_signal.connect(main_window.apply_graph_delta)
         self.worker.start()
 
     def stop_monitoring(self):
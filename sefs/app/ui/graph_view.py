@@ -1,33 +1,82 @@
-from PyQt6.QtWidgets import (QGraphicsView, QGraphicsScene, QGraphicsEllipseItem, 
-                             QGraphicsTextItem, QGraphicsPathItem)
+from PyQt6.QtWidgets import (QGraphicsView, QGraphicsScene, QGraphicsEllipseItem, QGraphicsItem,
+                             QGraphicsSimpleTextItem, QGraphicsPathItem)
 from PyQt6.QtGui import QBrush, QPen, QColor, QPainter, QFont, QPainterPath, QRadialGradient
-from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtCore import Qt, QPointF, QRectF, QByteArray, QDataStream, QIODevice
 import os
 import subprocess
 import platform
 from collections import defaultdict
 import math
+import numpy as np
+
+try:
+    from PyQt6.QtOpenGLWidgets import QOpenGLWidget  # Optional: GPU-rasterized viewport
+except ImportError:
+    QOpenGLWidget = None
+
+
+_NODE_SIZES = {'root': 50, 'cluster': 35, 'type': 25, 'file': 18}
+
+# QPainterPath's QDataStream format: int32 count, (int32 type, f64 x, f64 y) per element,
+# int32 cStart, int32 fill rule - all big-endian
+_PATH_ELEMENT = np.dtype([('type', '>i4'), ('x', '>f8'), ('y', '>f8')])
+_MOVE_TO, _CURVE_TO, _CURVE_DATA = 0, 2, 3
+
+
+def _curved_edges_path(starts, ends):
+    """
+    One QPainterPath holding a bowed curve per (start, end) pair, built with numpy and
+    streamed in through QDataStream (as pyqtgraph's arrayToQPath) instead of calling
+    moveTo/quadTo per edge.
+    """
+    p0 = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    p2 = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+    n = len(p0)
+    if n == 0:
+        return QPainterPath()
+    # Quadratic control point: midpoint pushed sideways by 10% of the edge length; the
+    # unit normal (-dy, dx) / length times 0.1 * length needs no sqrt or division
+    d = p2 - p0
+    q = (p0 + p2) / 2 + 0.1 * np.stack([-d[:, 1], d[:, 0]], axis=1)
+    
+    # QPainterPath stores curves as cubics: elevate each quadratic (p0, q, p2)
+    elements = np.empty((n, 4), dtype=_PATH_ELEMENT)
+    elements['type'] = (_MOVE_TO, _CURVE_TO, _CURVE_DATA, _CURVE_DATA)
+    points = np.stack([p0, p0 + 2 / 3 * (q - p0), p2 + 2 / 3 * (q - p2), p2], axis=1)
+    elements['x'] = points[..., 0]
+    elements['y'] = points[..., 1]
+    
+    header = np.array([4 * n], dtype='>i4').tobytes()
+    footer = np.array([4 * (n - 1), int(Qt.FillRule.OddEvenFill.value)], dtype='>i4').tobytes()
+    stream = QDataStream(QByteArray(header + elements.tobytes() + footer), QIODevice.OpenModeFlag.ReadOnly)
+    path = QPainterPath()
+    stream >> path
+    return path
 
 
 class FileNode(QGraphicsEllipseItem):
     """Interactive node with modern gradient styling"""
     
-    def __init__(self, file_data, color, node_type='file', parent=None):
-        size = 50 if node_type == 'root' else 35 if node_type == 'cluster' else 25 if node_type == 'type' else 18
+    # Only a dozen colors and four sizes: build each gradient brush once
+    _brush_cache = {}  # {(color_name, size): QBrush}
+    _pen = None
+    _hover_pen = None
+    
+    def __init__(self, file_data, color, node_type='file', cluster_name=None, parent=None):
+        size = _NODE_SIZES.get(node_type, 18)
         super().__init__(-size/2, -size/2, size, size, parent)
         
         self.file_data = file_data
         self.node_type = node_type
         self.base_color = color
+        self.cluster_name = cluster_name
+        self._tooltip = None  # built on first hover
         
-        # Create gradient brush
-        gradient = QRadialGradient(0, 0, size/2)
-        gradient.setColorAt(0, color.lighter(140))
-        gradient.setColorAt(0.7, color)
-        gradient.setColorAt(1, color.darker(120))
-        
-        self.setBrush(QBrush(gradient))
-        self.setPen(QPen(QColor("#ffffff"), 3))
+        self.setBrush(self._gradient_brush(color, size))
+        self.setPen(self._outline_pen())
+        # Shade the gradient once into a pixmap and blit it on pan/zoom repaints;
+        # setPen/setScale on hover invalidate it themselves
+        self.setCacheMode(QGraphicsEllipseItem.CacheMode.DeviceCoordinateCache)
         self.setZValue(2)
         
         # Enable interactions only for files
@@ -36,20 +85,45 @@ class FileNode(QGraphicsEllipseItem):
             self.setFlag(QGraphicsEllipseItem.GraphicsItemFlag.ItemIsSelectable)
             self.setCursor(Qt.CursorShape.PointingHandCursor)
         
+    @classmethod
+    def _outline_pen(cls):
+        if cls._pen is None:
+            cls._pen = QPen(QColor("#ffffff"), 3)
+            cls._hover_pen = QPen(QColor("#FFD700"), 4)
+        return cls._pen
+        
+    @classmethod
+    def _gradient_brush(cls, color, size):
+        key = (color.name(), size)
+        brush = cls._brush_cache.get(key)
+        if brush is None:
+            gradient = QRadialGradient(0, 0, size/2)
+            gradient.setColorAt(0, color.lighter(140))
+            gradient.setColorAt(0.7, color)
+            gradient.setColorAt(1, color.darker(120))
+            brush = cls._brush_cache[key] = QBrush(gradient)
+        return brush
+        
     def hoverEnterEvent(self, event):
         if self.node_type == 'file':
-            self.setPen(QPen(QColor("#FFD700"), 4))
+            self.setPen(FileNode._hover_pen)
             self.setScale(1.2)
-            tooltip = self._create_tooltip()
-            self.setToolTip(tooltip)
+            if self._tooltip is None:
+                self._tooltip = self._create_tooltip()
+                self.setToolTip(self._tooltip)
         super().hoverEnterEvent(event)
         
     def hoverLeaveEvent(self, event):
         if self.node_type == 'file':
-            self.setPen(QPen(QColor("#ffffff"), 3))
+            self.setPen(FileNode._pen)
             self.setScale(1.0)
         super().hoverLeaveEvent(event)
         
+    def set_file_data(self, file_data):
+        """Swap in fresh data for the same file; the tooltip is rebuilt on next hover"""
+        self.file_data = file_data
+        self._tooltip = None
+        
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton and self.node_type == 'file':
             file_path = self.file_data['path']
@@ -61,13 +135,16 @@ class FileNode(QGraphicsEllipseItem):
         filename = os.path.basename(data['path'])
         file_ext = os.path.splitext(filename)[1].upper()
         
+        # The worker sends the size it fingerprinted; stat only for data without it
+        size_bytes = data.get('size')
         try:
-            size_bytes = os.path.getsize(data['path'])
+            if size_bytes is None:
+                size_bytes = os.path.getsize(data['path'])
             size_str = self._format_size(size_bytes)
         except:
             size_str = "Unknown"
         
-        cluster = data.get('cluster_name', f"Cluster {data.get('cluster_id', -1)}")
+        cluster = self.cluster_name or f"Cluster {data.get('cluster_id', -1)}"
         preview = data.get('content_sample', '')[:100]
         if len(preview) == 100:
             preview += "..."
@@ -104,9 +181,57 @@ class FileNode(QGraphicsEllipseItem):
             print(f"Error opening file: {e}")
 
 
+class NodeBatchItem(QGraphicsItem):
+    """
+    Every non-interactive node (root, clusters, types) in one item: positions, sizes
+    and color indices as numpy arrays, painted in one call grouped by color.
+    """
+    
+    def __init__(self, xy, sizes, color_idx, colors, parent=None):
+        super().__init__(parent)
+        self.xy = np.asarray(xy, dtype=np.float32).reshape(-1, 2)
+        self.sizes = np.asarray(sizes, dtype=np.float32)
+        self.color_idx = np.asarray(color_idx, dtype=np.uint8)
+        self.colors = colors
+        self.setZValue(2)
+        
+        self._rect = QRectF()
+        if len(self.xy):
+            pad = float(self.sizes.max()) / 2 + 3  # radius plus half the outline
+            (x0, y0), (x1, y1) = self.xy.min(axis=0) - pad, self.xy.max(axis=0) + pad
+            self._rect = QRectF(float(x0), float(y0), float(x1 - x0), float(y1 - y0))
+        # The arrays never change after construction, so neither do the geometry queries
+        self._shape = QPainterPath()
+        self._shape.addRect(self._rect)
+        
+    def boundingRect(self):
+        return self._rect
+        
+    def shape(self):
+        return self._shape
+        
+    def paint(self, painter, option, widget=None):
+        painter.setPen(FileNode._outline_pen())
+        for c in np.unique(self.color_idx).tolist():
+            color = self.colors[c]
+            for i in np.flatnonzero(self.color_idx == c).tolist():
+                x, y = self.xy[i].tolist()
+                size = int(self.sizes[i])
+                # Gradients are centered on (0, 0), so paint each node in its own frame
+                painter.setBrush(FileNode._gradient_brush(color, size))
+                painter.translate(x, y)
+                painter.drawEllipse(QPointF(0, 0), size / 2, size / 2)
+                painter.translate(-x, -y)
+
+
 class GraphView(QGraphicsView):
     def __init__(self, parent=None):
         super().__init__(parent)
+        if QOpenGLWidget is not None:
+            # Gradients, ellipses and curved edges are rasterized on the GPU
+            self.setViewport(QOpenGLWidget())
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.SmartViewportUpdate)
+        self.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontSavePainterState, True)
         self.scene = QGraphicsScene(self)
         self.setScene(self.scene)
         self.setRenderHint(QPainter.RenderHint.Antialiasing)
@@ -127,66 +252,109 @@ class GraphView(QGraphicsView):
             '.txt': QColor("#2ecc71"),
             '.doc': QColor("#3498db"),
         }
+        self.default_type_color = QColor("#95a5a6")
+        
+        # Shades the layout draws with, derived once per palette color
+        self._cluster_shades = [(c.lighter(150), c.lighter(160), c.lighter(130))  # root edge, label, type edge
+                                for c in self.cluster_colors]
+        self._type_shades = {ext: (c.lighter(140), c.darker(110))  # label, file edge
+                             for ext, c in self.type_colors.items()}
+        self._default_type_shades = (self.default_type_color.lighter(140), self.default_type_color.darker(110))
         
         self.setBackgroundBrush(QBrush(QColor("#1a1a2e")))
+        self._nodes = []
+        self._edge_batches = {}
+        self._labels = []  # (label item, point size), for the zoom level-of-detail
+        self._items_by_path = {}  # {path: FileNode} of the files on screen
+        self._drawn = None  # what the current scene shows, see _drawn_key
 
-    def update_graph(self, files_data, reduced_coords=None):
+    def update_graph(self, files_data, reduced_coords=None, cluster_names=None):
         """Build radial graph: Root → Clusters → Types → Files"""
+        cluster_names = cluster_names or {}
+        groups = self._group(files_data)
+        drawn = self._drawn_key(groups, cluster_names)
+        if files_data and drawn == self._drawn:
+            # Same nodes in the same places: hand the file items their new data and
+            # keep the scene (and the user's zoom) as it is
+            for types in groups.values():
+                for _, shown in types.values():
+                    for file_info in shown:
+                        self._items_by_path[file_info['path']].set_file_data(file_info)
+            return
+        
         self.scene.clear()
+        self._labels = []
+        self._items_by_path = {}
+        self._drawn = drawn
         if not files_data:
             return
-
-        # Group by CLUSTER FIRST, then type
+        
+        # No BSP index while thousands of items go in; it's rebuilt once at the end
+        self.scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+        # Non-interactive nodes and all edges are collected, then added as a few batch items
+        self._nodes = []  # (x, y, size, color)
+        self._edge_batches = {}  # {(rgba, width): (QColor, starts, ends)}
+        try:
+            self._build_graph(groups, cluster_names)
+            self._flush_batches()
+        finally:
+            self.scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.BspTreeIndex)
+        
+        self.fitInView(self.scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+        self._update_label_lod()
+        
+    def _group(self, files_data):
+        """
+        {cluster_id: {ext: (file_count, shown_files)}}: files grouped by cluster
+        first, then type, with the representatives each type node shows
+        """
         cluster_groups = defaultdict(lambda: defaultdict(list))
         for file_info in files_data:
             cluster_id = file_info.get('cluster_id', -1)
             ext = os.path.splitext(file_info['path'])[1].lower()
             cluster_groups[cluster_id][ext].append(file_info)
+        return {cluster_id: {ext: (len(files), self._representatives(files, 15))  # Limit for clarity
+                             for ext, files in types.items()}
+                for cluster_id, types in cluster_groups.items()}
         
+    def _drawn_key(self, groups, cluster_names):
+        """Everything the layout depends on: equal keys give an identical scene"""
+        return tuple(
+            (cluster_id, cluster_names.get(cluster_id), ext, count, tuple(f['path'] for f in shown))
+            for cluster_id in sorted(groups)
+            for ext, (count, shown) in sorted(groups[cluster_id].items()))
+        
+    def _build_graph(self, cluster_groups, cluster_names):
+        """Adds the root, cluster, type and file nodes plus their edges to the scene"""
         # Root at center
         root_pos = (0, 0)
-        root_node = FileNode({'path': 'Root'}, QColor("#16213e"), 'root')
-        root_node.setPos(*root_pos)
-        self.scene.addItem(root_node)
+        self._add_node(root_pos, QColor("#16213e"), 'root')
         
-        root_label = QGraphicsTextItem("All Files")
-        root_label.setDefaultTextColor(QColor("#ffffff"))
-        font = QFont("Segoe UI", 12, QFont.Weight.Bold)
-        root_label.setFont(font)
-        root_label.setPos(-30, 35)
-        self.scene.addItem(root_label)
+        self._add_label("All Files", QColor("#ffffff"), 12, -30, 35)
         
         # CLUSTER level - inner ring
         cluster_radius = 220
         cluster_list = sorted(cluster_groups.keys())
         cluster_angle_step = 2 * math.pi / max(len(cluster_list), 1)
+        # Ring positions come from one vectorized cos/sin per ring
+        cluster_angles = np.arange(len(cluster_list)) * cluster_angle_step
+        cluster_xs, cluster_ys = self._ring(cluster_radius, cluster_angles)
         
-        for i, cluster_id in enumerate(cluster_list):
-            angle = i * cluster_angle_step
-            cluster_x = cluster_radius * math.cos(angle)
-            cluster_y = cluster_radius * math.sin(angle)
-            
-            color = self.cluster_colors[cluster_id % len(self.cluster_colors)]
-            cluster_node = FileNode({'path': f'C{cluster_id}'}, color, 'cluster')
-            cluster_node.setPos(cluster_x, cluster_y)
-            self.scene.addItem(cluster_node)
+        for cluster_id, angle, cluster_x, cluster_y in zip(
+                cluster_list, cluster_angles.tolist(), cluster_xs, cluster_ys):
+            palette_idx = cluster_id % len(self.cluster_colors)
+            color = self.cluster_colors[palette_idx]
+            root_edge_color, label_color, type_edge_color = self._cluster_shades[palette_idx]
+            self._add_node((cluster_x, cluster_y), color, 'cluster')
             
             # Edge from root to cluster
-            self._add_edge(root_pos, (cluster_x, cluster_y), color.lighter(150), 2)
+            self._add_edge(root_pos, (cluster_x, cluster_y), root_edge_color, 2)
             
             # Cluster label
-            cluster_name = f"Cluster {cluster_id}"
-            if cluster_groups[cluster_id]:
-                first_file = list(cluster_groups[cluster_id].values())[0][0]
-                cluster_name = first_file.get('cluster_name', cluster_name)
+            cluster_name = cluster_names.get(cluster_id, f"Cluster {cluster_id}")
             
-            label = QGraphicsTextItem(cluster_name)
-            label.setDefaultTextColor(color.lighter(160))
-            font = QFont("Segoe UI", 9, QFont.Weight.Bold)
-            label.setFont(font)
-            label_width = label.boundingRect().width()
-            label.setPos(cluster_x - label_width/2, cluster_y + 28)
-            self.scene.addItem(label)
+            label = self._add_label(cluster_name, label_color, 9, cluster_x, cluster_y + 28)
+            label.moveBy(-label.boundingRect().width()/2 - self._LABEL_MARGIN, 0)
             
             # TYPE level - middle ring (within cluster's arc)
             type_radius = 380
@@ -196,73 +364,118 @@ class GraphView(QGraphicsView):
             angle_start = angle - cluster_angle_step/2
             angle_end = angle + cluster_angle_step/2
             type_angle_step = (angle_end - angle_start) / max(len(types_in_cluster), 1)
+            type_xs, type_ys = self._ring(
+                type_radius, angle_start + (np.arange(len(types_in_cluster)) + 0.5) * type_angle_step)
             
-            for j, ext in enumerate(types_in_cluster):
-                type_angle = angle_start + (j + 0.5) * type_angle_step
-                type_x = type_radius * math.cos(type_angle)
-                type_y = type_radius * math.sin(type_angle)
-                
-                type_color = self.type_colors.get(ext, QColor("#95a5a6"))
-                type_node = FileNode({'path': ext}, type_color, 'type')
-                type_node.setPos(type_x, type_y)
-                self.scene.addItem(type_node)
+            for j, (ext, type_x, type_y) in enumerate(zip(types_in_cluster, type_xs, type_ys)):
+                type_color = self.type_colors.get(ext, self.default_type_color)
+                type_label_color, file_edge_color = self._type_shades.get(ext, self._default_type_shades)
+                self._add_node((type_x, type_y), type_color, 'type')
                 
                 # Edge from cluster to type
-                self._add_edge((cluster_x, cluster_y), (type_x, type_y), color.lighter(130), 1.5)
+                self._add_edge((cluster_x, cluster_y), (type_x, type_y), type_edge_color, 1.5)
                 
                 # Type label
-                type_label = QGraphicsTextItem(ext.upper())
-                type_label.setDefaultTextColor(type_color.lighter(140))
-                font = QFont("Segoe UI", 7, QFont.Weight.Bold)
-                type_label.setFont(font)
-                type_label.setPos(type_x - 10, type_y + 18)
-                self.scene.addItem(type_label)
+                self._add_label(ext.upper(), type_label_color, 7, type_x - 10, type_y + 18)
                 
                 # FILE level - outer ring
                 file_radius = 520
-                files = cluster_groups[cluster_id][ext]
-                file_count = len(files)
+                file_count, shown = cluster_groups[cluster_id][ext]
                 file_angle_step = type_angle_step / max(file_count, 1)
+                file_xs, file_ys = self._ring(
+                    file_radius, angle_start + j * type_angle_step + np.arange(len(shown)) * file_angle_step)
                 
-                for k, file_info in enumerate(files[:15]):  # Limit for clarity
-                    file_angle = angle_start + j * type_angle_step + k * file_angle_step
-                    file_x = file_radius * math.cos(file_angle)
-                    file_y = file_radius * math.sin(file_angle)
-                    
-                    file_node = FileNode(file_info, color, 'file')
+                for file_info, file_x, file_y in zip(shown, file_xs, file_ys):
+                    file_node = FileNode(file_info, color, 'file', cluster_name)
                     file_node.setPos(file_x, file_y)
                     self.scene.addItem(file_node)
+                    self._items_by_path[file_info['path']] = file_node
                     
                     # Edge from type to file
-                    self._add_edge((type_x, type_y), (file_x, file_y), type_color.darker(110), 1)
+                    self._add_edge((type_x, type_y), (file_x, file_y), file_edge_color, 1)
         
-        self.fitInView(self.scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+    def _representatives(self, files, k):
+        """
+        Up to k files closest to the group's centroid in the 2D layout ('coord'),
+        in their original order. Files without a point (added by a delta) rank last.
+        """
+        if len(files) <= k:
+            return files
+        coords = np.array([f.get('coord', (np.nan, np.nan)) for f in files], dtype=np.float64)
+        known = np.isfinite(coords).all(axis=1)
+        if not known.any():
+            return files[:k]
+        dists = ((coords - coords[known].mean(axis=0)) ** 2).sum(axis=1)
+        dists[~known] = np.inf
+        top = np.sort(np.argpartition(dists, k - 1)[:k])  # O(n) selection, no full sort
+        return [files[i] for i in top]
         
-    def _add_edge(self, start, end, color, width):
-        """Add curved edge between nodes"""
-        path = QPainterPath()
-        path.moveTo(QPointF(*start))
-        
-        mid_x = (start[0] + end[0]) / 2
-        mid_y = (start[1] + end[1]) / 2
-        
-        dx = end[0] - start[0]
-        dy = end[1] - start[1]
-        length = math.sqrt(dx**2 + dy**2)
-        if length > 0:
-            offset = length * 0.1
-            ctrl_x = mid_x - dy/length * offset
-            ctrl_y = mid_y + dx/length * offset
-        else:
-            ctrl_x, ctrl_y = mid_x, mid_y
+    def _ring(self, radius, angles):
+        """(xs, ys) as Python float lists for points at angles on a circle of radius"""
+        return (radius * np.cos(angles)).tolist(), (radius * np.sin(angles)).tolist()
+        
+    _LABEL_MARGIN = 4  # QGraphicsTextItem's document margin, kept so labels don't shift
+    _label_fonts = {}  # {point_size: QFont}
+    
+    def _add_label(self, text, color, point_size, x, y):
+        """
+        Plain-text label: QGraphicsSimpleTextItem has no QTextDocument layout, and the
+        device-coordinate cache rasterizes it once per zoom level instead of every paint.
+        """
+        font = self._label_fonts.get(point_size)
+        if font is None:
+            font = self._label_fonts[point_size] = QFont("Segoe UI", point_size, QFont.Weight.Bold)
+        label = QGraphicsSimpleTextItem(text)
+        label.setBrush(QBrush(color))
+        label.setFont(font)
+        label.setPos(x + self._LABEL_MARGIN, y + self._LABEL_MARGIN)
+        label.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+        self.scene.addItem(label)
+        self._labels.append((label, point_size))
+        return label
         
-        path.quadTo(QPointF(ctrl_x, ctrl_y), QPointF(*end))
+    _LABEL_MIN_SCREEN_PX = 6  # labels smaller than this on screen are unreadable: hide them
+    
+    def _update_label_lod(self):
+        """Level of detail: show only labels that are readable at the current zoom"""
+        px_per_pt = self.transform().m11() * self.logicalDpiY() / 72
+        for label, point_size in self._labels:
+            label.setVisible(point_size * px_per_pt >= self._LABEL_MIN_SCREEN_PX)
+        
+    def _add_node(self, pos, color, node_type):
+        """Queue a non-interactive node for the NodeBatchItem"""
+        self._nodes.append((pos[0], pos[1], _NODE_SIZES[node_type], color))
+        
+    def _add_edge(self, start, end, color, width):
+        """Queue a curved edge between nodes; edges of one color and width share one path"""
+        key = (color.rgba(), width)
+        batch = self._edge_batches.get(key)
+        if batch is None:
+            batch = self._edge_batches[key] = (color, [], [])
+        batch[1].append(start)
+        batch[2].append(end)
+
+    def _flush_batches(self):
+        """One QGraphicsPathItem per edge style and one NodeBatchItem for all queued nodes"""
+        for (_, width), (color, starts, ends) in self._edge_batches.items():
+            edge = QGraphicsPathItem(_curved_edges_path(starts, ends))
+            edge.setPen(QPen(color, width, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap))
+            edge.setZValue(0)
+            edge.setOpacity(0.6)
+            self.scene.addItem(edge)
         
-        edge = QGraphicsPathItem(path)
-        edge.setPen(QPen(color, width, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap))
-        edge.setZValue(0)
-        edge.setOpacity(0.6)
-        self.scene.addItem(edge)
+        if self._nodes:
+            colors, color_idx = [], {}
+            for _, _, _, color in self._nodes:
+                color_idx.setdefault(color.rgba(), len(colors))
+                if len(colors) < len(color_idx):
+                    colors.append(color)
+            self.scene.addItem(NodeBatchItem(
+                [(x, y) for x, y, _, _ in self._nodes],
+                [size for _, _, size, _ in self._nodes],
+                [color_idx[color.rgba()] for _, _, _, color in self._nodes],
+                colors))
+        self._nodes, self._edge_batches = [], {}
 
     def wheelEvent(self, event):
         zoom_factor = 1.15
@@ -270,3 +483,4 @@ class GraphView(QGraphicsView):
             self.scale(zoom_factor, zoom_factor)
         else:
             self.scale(1/zoom_factor, 1/zoom_factor)
+        self._update_label_lod()
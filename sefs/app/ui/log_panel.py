@@ -1,19 +1,38 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTextEdit
-from PyQt6.QtCore import pyqtSlot
-import datetime
+from PyQt6.QtCore import pyqtSlot, QTimer
+import time
 
 class LogPanel(QWidget):
+    FLUSH_MS = 50  # coalesce bursts of messages into one append per interval
+    MAX_LINES = 2000  # older lines are dropped by the document
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.layout = QVBoxLayout(self)
         self.text_edit = QTextEdit()
         self.text_edit.setReadOnly(True)
+        self.text_edit.document().setMaximumBlockCount(self.MAX_LINES)
         self.layout.addWidget(self.text_edit)
 
+        self._buf = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_MS)
+        self._flush_timer.timeout.connect(self._flush)
+
     @pyqtSlot(str)
     def add_log(self, message):
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        self.text_edit.append(f"[{timestamp}] {message}")
+        timestamp = time.strftime("%H:%M:%S")
+        self._buf.append(f"[{timestamp}] {message}")
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush(self):
+        """Append the buffered lines in one go, then scroll to the bottom once"""
+        if not self._buf:
+            return
+        self.text_edit.append("\n".join(self._buf))
+        self._buf.clear()
         # Scroll to bottom
         scrollbar = self.text_edit.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
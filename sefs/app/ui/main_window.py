@@ -1,12 +1,13 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QPushButton, QLabel, QFileDialog, QSplitter)
-from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot
+from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot, QTimer
 from .graph_view import GraphView
 from .log_panel import LogPanel
 
 class MainWindow(QMainWindow):
     start_monitoring_signal = pyqtSignal(str)
     stop_monitoring_signal = pyqtSignal()
+    GRAPH_REDRAW_MS = 200  # bursts of worker updates are drawn once per window
 
     def __init__(self):
         super().__init__()
@@ -46,6 +47,17 @@ class MainWindow(QMainWindow):
         
         self.root_path = None
         self.is_monitoring = False
+        
+        # Last full graph, patched in place by apply_graph_delta
+        self._graph_files = {}  # {path: file_dict}
+        self._graph_coords = None
+        self._cluster_names = {}
+        
+        # Worker updates only patch the data above; the scene is rebuilt at most once per interval
+        self._graph_timer = QTimer(self)
+        self._graph_timer.setSingleShot(True)
+        self._graph_timer.setInterval(self.GRAPH_REDRAW_MS)
+        self._graph_timer.timeout.connect(self._redraw_graph)
 
     def select_root(self):
         folder = QFileDialog.getExistingDirectory(self, "Select Root Directory")
@@ -76,23 +88,42 @@ class MainWindow(QMainWindow):
             return
             
         cluster_names = cluster_names or {}
-            
-        # Convert tuple data to dict format for graph view
-        formatted_data = []
-        for file_info in files_data:
-            if isinstance(file_info, (list, tuple)):
-                # Format: (id, path, hash, embedding, cluster_id, last_modified, content_sample)
-                c_id = file_info[4]
-                file_dict = {
-                    'path': file_info[1],
-                    'cluster_id': c_id,
-                    'content_sample': file_info[6] if len(file_info) > 6 else '',
-                    'cluster_name': cluster_names.get(c_id, f"Cluster {c_id}")
-                }
-                formatted_data.append(file_dict)
-            else:
-                formatted_data.append(file_info)
+        
+        # The worker's file dicts go to the view as they are (cluster names are
+        # looked up per cluster by the view). Each file keeps its 2D point, so the
+        # view can pick representatives after deltas too
+        if len(reduced_coords) == len(files_data):
+            for file_dict, coord in zip(files_data, reduced_coords):
+                file_dict['coord'] = coord
+        
+        self._graph_files = {d['path']: d for d in files_data}
+        self._graph_coords = reduced_coords
+        self._cluster_names = cluster_names
         
         # Update graph
-        self.graph_view.update_graph(formatted_data, reduced_coords)
-        self.log_panel.add_log(f"Graph updated: {len(formatted_data)} files")
+        self._schedule_redraw()
+        self.log_panel.add_log(f"Graph updated: {len(files_data)} files")
+
+    @pyqtSlot(object, object, object)
+    def apply_graph_delta(self, added, moved, removed):
+        """Patch the last full graph with the files that changed in an incremental pass"""
+        if self._graph_coords is None:
+            return
+        for path in removed:
+            self._graph_files.pop(path, None)
+        for file_info in moved:
+            self._graph_files.pop(file_info.pop('old_path'), None)
+        for file_info in list(added) + list(moved):
+            self._graph_files[file_info['path']] = file_info
+        
+        self._schedule_redraw()
+        self.log_panel.add_log(f"Graph updated: {len(added)} added, {len(moved)} changed, {len(removed)} removed")
+
+    def _schedule_redraw(self):
+        # Not restarted while pending: a steady stream of updates still redraws every interval
+        if not self._graph_timer.isActive():
+            self._graph_timer.start()
+
+    def _redraw_graph(self):
+        """Draw the latest graph state; intermediate states from a burst are never drawn"""
+        self.graph_view.update_graph(list(self._graph_files.values()), self._graph_coords, self._cluster_names)